@@ -0,0 +1,167 @@
+# Hagstofan/anomaly.py
+import numpy as np
+
+from Hagstofan.matrix import IndexMatrix, month_label, month_ordinal
+
+
+# sqrt(pi / 2): turns the mean absolute deviation of a normal variable into its
+# standard deviation
+MEAN_ABS_DEVIATION_TO_SIGMA = 1.2533
+
+
+class AnomalyDetector:
+    """
+    Streaming outlier and level-shift detection on the monthly % change of every series.
+
+    For each series the detector keeps an exponentially weighted location and
+    absolute deviation of its monthly changes, plus two-sided CUSUM sums of the
+    standardized changes. Changes are winsorized before they update the running
+    statistics, so a single spike does not inflate the series' own yardstick.
+    Appending a month costs O(series).
+
+    Example:
+        detector = AnomalyDetector.from_matrix(Panel({"cpi": cpi, "ppi": ppi}))
+        detector.update("2025M01", new_values)["outliers"]
+    """
+
+    STATE_FIELDS = ("last_value", "location", "scale", "cusum_pos", "cusum_neg", "count")
+
+    def __init__(self, codes, alpha: float = 0.1, threshold: float = 4.0,
+                 shift_threshold: float = 5.0, drift: float = 0.5, warmup: int = 12):
+        """
+        Args:
+            codes (list): Series codes, in the column order of the values passed to `update`.
+            alpha (float): EWMA smoothing factor for the running statistics.
+            threshold (float): Robust z-score above which a change is flagged as an outlier.
+            shift_threshold (float): CUSUM level above which a level shift is flagged.
+            drift (float): CUSUM allowance subtracted from each standardized change.
+            warmup (int): Changes a series needs before it can be flagged.
+        """
+        self.codes = list(codes)
+        self.alpha = alpha
+        self.threshold = threshold
+        self.shift_threshold = shift_threshold
+        self.drift = drift
+        self.warmup = warmup
+        self.last_month = None
+
+        n = len(self.codes)
+        self.last_value = np.full(n, np.nan)
+        self.location = np.zeros(n)
+        self.scale = np.zeros(n)
+        self.cusum_pos = np.zeros(n)
+        self.cusum_neg = np.zeros(n)
+        self.count = np.zeros(n, dtype=np.int64)
+
+    @classmethod
+    def from_matrix(cls, matrix, **kwargs):
+        """
+        Creates a detector for every series of a matrix and runs it over the history.
+        """
+        matrix = matrix.to_matrix() if hasattr(matrix, "to_matrix") else matrix
+        detector = cls(matrix.codes, **kwargs)
+        detector.update_from(matrix)
+        return detector
+
+    def update(self, month: str, values):
+        """
+        Feeds one new month of index values (one per series, NaN if missing).
+
+        Args:
+            month (str): The month in format "YYYYMmm"; must follow the last month seen.
+            values (array-like): Index values in the order of `codes`.
+
+        Returns:
+            dict: {"month": str, "outliers": [code, ...], "shifts": [code, ...],
+                   "z": np.ndarray of robust z-scores}
+        """
+        if self.last_month is not None and month_ordinal(month) != month_ordinal(self.last_month) + 1:
+            raise ValueError(f"Expected {month_label(month_ordinal(self.last_month) + 1)}, got {month}")
+        values = np.array(values, dtype=float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = (values / self.last_value - 1) * 100
+            sigma = MEAN_ABS_DEVIATION_TO_SIGMA * self.scale
+            z = (change - self.location) / sigma
+        valid = ~np.isnan(change)
+        ready = valid & (self.count >= self.warmup) & (sigma > 0)
+        z = np.where(ready, z, np.nan)
+
+        outliers = ready & (np.abs(z) > self.threshold)
+        step = np.where(ready, z, 0.0)
+        self.cusum_pos = np.maximum(0.0, self.cusum_pos + step - self.drift)
+        self.cusum_neg = np.maximum(0.0, self.cusum_neg - step - self.drift)
+        shifts = ready & ((self.cusum_pos > self.shift_threshold) | (self.cusum_neg > self.shift_threshold))
+        self.cusum_pos[shifts] = 0.0
+        self.cusum_neg[shifts] = 0.0
+
+        # Winsorize before updating so outliers do not drag the statistics along
+        bound = self.threshold * sigma
+        clipped = np.where(ready, np.clip(change, self.location - bound, self.location + bound), change)
+        first = valid & (self.count == 0)
+        rest = valid & ~first
+        self.location[first] = clipped[first]
+        deviation = np.abs(clipped - self.location)
+        self.location[rest] += self.alpha * (clipped[rest] - self.location[rest])
+        self.scale[rest] += self.alpha * (deviation[rest] - self.scale[rest])
+        self.count[valid] += 1
+
+        # A missing month leaves NaN here, so no change is computed across the gap
+        self.last_value = values
+        self.last_month = month
+        return {
+            "month": month,
+            "outliers": [self.codes[i] for i in np.flatnonzero(outliers)],
+            "shifts": [self.codes[i] for i in np.flatnonzero(shifts)],
+            "z": z,
+        }
+
+    def update_from(self, matrix):
+        """
+        Feeds every month of `matrix` after the last month seen.
+
+        Returns:
+            list: One result dict per new month (see `update`).
+        """
+        matrix = matrix.to_matrix() if hasattr(matrix, "to_matrix") else matrix
+        columns = [matrix.position(code) for code in self.codes]
+        if None in columns:
+            raise KeyError(f"Series '{self.codes[columns.index(None)]}' is missing from the matrix")
+        start = 0
+        if self.last_month is not None:
+            start = int(np.searchsorted(matrix.ordinals, month_ordinal(self.last_month), side="right"))
+        return [self.update(matrix.months[i], matrix.values[i, columns]) for i in range(start, len(matrix.months))]
+
+    def save(self, path, matrix=None):
+        """
+        Saves the detector state, and optionally the data it was fed, to one .npz file.
+        """
+        arrays = {name: getattr(self, name) for name in self.STATE_FIELDS}
+        arrays["codes"] = np.array(self.codes)
+        arrays["settings"] = np.array([self.alpha, self.threshold, self.shift_threshold, self.drift, self.warmup])
+        arrays["last_month"] = np.array(self.last_month or "")
+        if matrix is not None:
+            arrays["data_months"] = np.array(matrix.months)
+            arrays["data_codes"] = np.array(matrix.codes)
+            arrays["data_values"] = matrix.values
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a detector saved with `save`.
+
+        Returns:
+            tuple: (AnomalyDetector, IndexMatrix or None)
+        """
+        with np.load(path) as data:
+            alpha, threshold, shift_threshold, drift, warmup = data["settings"]
+            detector = cls(data["codes"].tolist(), alpha=float(alpha), threshold=float(threshold),
+                           shift_threshold=float(shift_threshold), drift=float(drift), warmup=int(warmup))
+            for name in cls.STATE_FIELDS:
+                setattr(detector, name, data[name].copy())
+            detector.last_month = str(data["last_month"]) or None
+            matrix = None
+            if "data_values" in data:
+                matrix = IndexMatrix(data["data_months"].tolist(), data["data_codes"].tolist(), data["data_values"].copy())
+        return detector, matrix
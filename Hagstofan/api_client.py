@@ -1,12 +1,56 @@
 # Hagstofan/api_client.py
+import threading
+import time
+
 import requests
 
+class RateLimiter:
+    """
+    Thread-safe limit on how many requests may start per second.
+
+    Shared by every thread that uses the same APIClient, so concurrent downloads
+    stay under one global rate.
+    """
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
 class APIClient:
-    def __init__(self, base_url):
+    def __init__(self, base_url, rate_limiter=None):
         self.base_url = base_url.rstrip('/')
+        self.rate_limiter = rate_limiter
+        self._config = None
 
     def post(self, endpoint, json_body):
         url = f"{self.base_url}/{endpoint.strip('/')}"
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
         response = requests.post(url, json=json_body)
         response.raise_for_status()
         return response.json()
+
+    def get(self, endpoint):
+        url = f"{self.base_url}/{endpoint.strip('/')}"
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        response = requests.get(url)
+        response.raise_for_status()
+        return response.json()
+
+    def get_config(self):
+        """
+        Returns the PX-Web API configuration (including "maxValues"), fetched once.
+        """
+        if self._config is None:
+            self._config = self.get("?config")
+        return self._config
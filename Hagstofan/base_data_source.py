@@ -1,10 +1,311 @@
 # Hagstofan/base_data_source.py
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+import math
+import requests
+from Hagstofan.matrix import IndexMatrix
+from Hagstofan.quality import MONTH_PATTERN, QualityReport
+
+# Cell limit used when the server does not report its own "maxValues"
+DEFAULT_MAX_CELLS = 100000
+
+class FrozenDict(dict):
+    """
+    A dict that refuses modification, used for the data of published snapshots.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("snapshot data is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
 
 class BaseDataSource(ABC):
+    """
+    Base class for PX-Web tables.
+
+    A loaded data source publishes its data as an immutable snapshot: a frozen
+    instance of the same class holding one version of the data and its derived
+    caches. `load()` builds the next snapshot off to the side and publishes it
+    with a single reference assignment, so readers never take a lock. Reading an
+    attribute such as `index` on the data source reads the current snapshot; a
+    reader that needs several consistent reads pins one with `snapshot()`.
+    Old snapshots are freed once the last reader drops its reference.
+    """
+
+    # Number of chunk requests sent in parallel when a query is split
+    chunk_workers = 4
+
     def __init__(self, client, endpoint):
         self.client = client
         self.endpoint = endpoint
+        self._metadata = None
+        self._snapshot = None
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the instance: read them from the
+        # current snapshot
+        snapshot = self.__dict__.get('_snapshot')
+        if snapshot is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return getattr(snapshot, name)
+
+    def __setattr__(self, name, value):
+        # Private caches may still be filled in lazily on a frozen instance
+        if not name.startswith('_') and self.__dict__.get('_frozen'):
+            raise AttributeError(f"{type(self).__name__} is shared and read-only; cannot set '{name}'")
+        super().__setattr__(name, value)
+
+    def freeze(self):
+        """
+        Makes the loaded data read-only so the instance can be shared between callers.
+
+        Dicts are replaced by read-only FrozenDicts, sets by frozensets and lists by
+        tuples, and public attributes can no longer be reassigned. A frozen data
+        source can still `load()`, since that only publishes a new snapshot.
+        """
+        for name, value in list(vars(self).items()):
+            if name.startswith('_'):
+                continue
+            if isinstance(value, dict):
+                object.__setattr__(self, name, FrozenDict(value))
+            elif isinstance(value, set):
+                object.__setattr__(self, name, frozenset(value))
+            elif isinstance(value, list):
+                object.__setattr__(self, name, tuple(value))
+        self._frozen = True
 
     def get_data(self, json_body):
-        return self.client.post(self.endpoint, json_body)
+        """
+        Posts a query to the table and returns the JSON response.
+
+        Queries that would return more cells than the server allows are split
+        along their largest dimension into compliant chunks, fetched in parallel
+        and merged back into one response.
+        """
+        chunks = self._split_query(json_body)
+        if chunks is None or len(chunks) == 1:
+            return self.client.post(self.endpoint, json_body)
+
+        with ThreadPoolExecutor(max_workers=self.chunk_workers) as pool:
+            responses = list(pool.map(lambda body: self.client.post(self.endpoint, body), chunks))
+
+        merged = dict(responses[0])
+        data, seen = [], set()
+        for response in responses:
+            for entry in response.get("data", []):
+                key = tuple(entry.get("key", []))
+                if key not in seen:
+                    seen.add(key)
+                    data.append(entry)
+        merged["data"] = data
+        return merged
+
+    def get_metadata(self):
+        """
+        Returns the table metadata (title and variables with their values).
+
+        The metadata is fetched once and reused until `load()` drops it, since the
+        values of a variable (such as the months) grow when the table is updated.
+        """
+        if self._metadata is None:
+            self._metadata = self.client.get(self.endpoint)
+        return self._metadata
+
+    def get_cell_limit(self):
+        """
+        Returns the largest number of cells the server returns for one query.
+        """
+        get_config = getattr(self.client, "get_config", None)
+        config = get_config() if get_config else {}
+        return config.get("maxValues") or DEFAULT_MAX_CELLS
+
+    def _split_query(self, json_body):
+        # Returns the query split into chunks under the cell limit, or None when
+        # the table metadata is unavailable and the query must be sent as is.
+        try:
+            variables = self.get_metadata()["variables"]
+            limit = self.get_cell_limit()
+        except (KeyError, TypeError, requests.RequestException):
+            return None
+
+        query = {item["code"]: item for item in json_body.get("query", [])}
+        selections = {}
+        for variable in variables:
+            item = query.get(variable["code"])
+            if item is None:
+                # Variables left out of the query are eliminated when the table allows it
+                selections[variable["code"]] = None if variable.get("elimination") else list(variable["values"])
+                continue
+            selected = self._expand_selection(variable, item["selection"])
+            if selected is None:
+                return None
+            selections[variable["code"]] = selected
+
+        pieces = self._split_selections(selections, limit)
+        if len(pieces) == 1:
+            return [json_body]
+        return [self._query_for(json_body, piece) for piece in pieces]
+
+    @staticmethod
+    def _expand_selection(variable, selection):
+        values = variable["values"]
+        wanted = selection.get("values", [])
+        kind = selection.get("filter")
+        if kind == "item":
+            return list(wanted)
+        if kind == "all":
+            return [v for v in values if any(fnmatchcase(v, pattern) for pattern in wanted)]
+        if kind == "top":
+            count = int(wanted[0])
+            return list(values[-count:]) if variable.get("time") else list(values[:count])
+        return None
+
+    @staticmethod
+    def _split_selections(selections, limit):
+        cells = math.prod(len(v) for v in selections.values() if v is not None)
+        if cells <= limit:
+            return [selections]
+        code = max((c for c, v in selections.items() if v), key=lambda c: len(selections[c]))
+        values = selections[code]
+        if len(values) == 1:
+            # Cannot split any further
+            return [selections]
+        size = max(1, len(values) * limit // cells)
+        pieces = []
+        for start in range(0, len(values), size):
+            piece = dict(selections)
+            piece[code] = values[start:start + size]
+            pieces.extend(BaseDataSource._split_selections(piece, limit))
+        return pieces
+
+    @staticmethod
+    def _query_for(json_body, selections):
+        body = dict(json_body)
+        body["query"] = [
+            {"code": code, "selection": {"filter": "item", "values": values}}
+            for code, values in selections.items() if values is not None
+        ]
+        return body
+
+    def load(self):
+        """
+        Downloads the table and publishes a new snapshot of it. Implemented by each data source.
+
+        Implementations start by dropping the cached metadata, so a query split into
+        chunks asks for the values the table has now.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not implement load()")
+
+    def snapshot(self):
+        """
+        Returns the current snapshot, pinned: it never changes, even if a reload
+        publishes a newer one while it is in use. It has all the methods of the
+        data source.
+        """
+        return self.__dict__.get('_snapshot') or self
+
+    def _new_snapshot(self):
+        # An empty instance of the same class for load() to fill in
+        current = self.__dict__.get('_snapshot')
+        snapshot = object.__new__(type(self))
+        snapshot.__dict__.update(
+            client=self.client,
+            endpoint=self.endpoint,
+            version=current.version + 1 if current is not None else 1,
+            _metadata=None,
+            _matrix=None,
+            _quality=None,
+        )
+        return snapshot
+
+    def _publish(self, snapshot):
+        # Validate and freeze the new snapshot, then swap it in with one assignment
+        snapshot.quality_report()
+        snapshot.freeze()
+        self._snapshot = snapshot
+
+    def watched_endpoints(self):
+        """
+        Returns the table endpoints this data source is built from.
+        """
+        return [self.endpoint]
+
+    def get_last_updated(self):
+        """
+        Returns when the source tables were last updated on the PX-Web server.
+
+        Only the navigation listing of each table's folder is fetched (a small GET),
+        not the table data.
+
+        Returns:
+            str | None: The latest "updated" timestamp among the watched tables,
+                or None if the server does not report one.
+        """
+        stamps = []
+        for endpoint in self.watched_endpoints():
+            folder, _, table = endpoint.strip('/').rpartition('/')
+            for entry in self.client.get(folder):
+                if entry.get("id") == table and entry.get("updated"):
+                    stamps.append(entry["updated"])
+        return max(stamps) if stamps else None
+
+    @staticmethod
+    def parse_value(entry):
+        """
+        Returns the first value of a PX data row as a float, or None for placeholders
+        such as "." and ".." that are not numbers.
+        """
+        try:
+            return float(entry["values"][0])
+        except (ValueError, IndexError, KeyError, TypeError):
+            return None
+
+    def quality_report(self):
+        """
+        Returns the QualityReport of the loaded index, built when a snapshot is published.
+
+        The report holds observed, placeholder and gap bitmaps per (month, series)
+        and lists duplicate keys, malformed month labels, series whose months
+        arrived out of order and weights that were placeholders.
+        """
+        snapshot = self.snapshot()
+        if getattr(snapshot, "_quality", None) is None:
+            snapshot._quality = QualityReport(getattr(snapshot, "index", {}), getattr(snapshot, "missing", {}),
+                                              getattr(snapshot, "duplicates", []),
+                                              getattr(snapshot, "missing_weights", {}))
+        return snapshot._quality
+
+    def get_label(self, code: str) -> str:
+        """
+        Returns a human-readable label for a series code, falling back to the code itself.
+        """
+        return code
+
+    def to_matrix(self):
+        """
+        Returns the loaded `index` dict as a dense (month x series) IndexMatrix.
+
+        The matrix is built once per snapshot and cached on it.
+        """
+        snapshot = self.snapshot()
+        if getattr(snapshot, "_matrix", None) is None:
+            index = {k: v for k, v in getattr(snapshot, "index", {}).items() if MONTH_PATTERN.match(k[0])}
+            snapshot._matrix = IndexMatrix.from_index(index)
+        return snapshot._matrix
+
+    def rebase(self, base: str):
+        """
+        Returns all series rebased so that `base` equals 100.
+
+        Args:
+            base (str): A month ("2015M01") or a year ("2015") for a base-year average.
+
+        Returns:
+            RebasedMatrix: Derived view over `to_matrix()`, cached per base.
+        """
+        return self.to_matrix().rebase(base)
@@ -0,0 +1,104 @@
+# Hagstofan/bootstrap.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Hagstofan.matrix import month_label
+
+
+def _simulate_series(changes, last_value, seed, horizon, n_resamples, block_size, quantiles):
+    """
+    Moving-block bootstrap of one series' monthly % changes.
+
+    All resamples are drawn and compounded in a single batch of array operations.
+    """
+    if len(changes) == 0 or np.isnan(last_value):
+        return np.full((len(quantiles), horizon), np.nan)
+
+    rng = np.random.default_rng(seed)
+    block = min(block_size, len(changes))
+    n_blocks = -(-horizon // block)
+    starts = rng.integers(0, len(changes) - block + 1, size=(n_resamples, n_blocks))
+    positions = (starts[:, :, None] + np.arange(block)).reshape(n_resamples, -1)[:, :horizon]
+
+    paths = last_value * np.cumprod(1 + changes[positions] / 100, axis=1)
+    return np.quantile(paths, quantiles, axis=0)
+
+
+def _simulate_chunk(args):
+    columns, last_values, seeds, horizon, n_resamples, block_size, quantiles = args
+    return np.stack([
+        _simulate_series(changes, last_value, seed, horizon, n_resamples, block_size, quantiles)
+        for changes, last_value, seed in zip(columns, last_values, seeds)
+    ], axis=-1)
+
+
+def bootstrap_bands(source, horizon: int = 6, n_resamples: int = 2000, block_size: int = 12,
+                    quantiles=(0.05, 0.5, 0.95), history=None, codes=None, seed=None, processes=None):
+    """
+    Projects uncertainty bands for every series of a data source by block-bootstrapping
+    historical monthly changes.
+
+    Each series gets its own child seed spawned from `seed`, so the result is the same
+    whatever the number of processes used.
+
+    Args:
+        source: A loaded data source (CPI, ProductionPriceIndex, ...) or an IndexMatrix.
+        horizon (int): Number of months to project past the last observed month.
+        n_resamples (int): Number of bootstrap paths per series.
+        block_size (int): Length of the resampled blocks of consecutive monthly changes.
+        quantiles (tuple): Quantiles of the simulated paths to return.
+        history (int, optional): Only resample the last `history` months. Defaults to all.
+        codes (list, optional): Series to simulate. Defaults to all series in the source.
+        seed (int, optional): Seed for reproducible results.
+        processes (int, optional): Size of the process pool. 1 runs in the current process.
+
+    Returns:
+        dict: {"months": [...], "codes": [...], "quantiles": np.ndarray,
+               "bands": np.ndarray shaped (quantile, month, series)}
+    """
+    matrix = source.to_matrix() if hasattr(source, "to_matrix") else source
+    codes = list(matrix.codes) if codes is None else list(codes)
+    quantiles = np.asarray(quantiles, dtype=float)
+    if not codes or len(matrix) == 0:
+        return {"months": [], "codes": codes, "quantiles": quantiles,
+                "bands": np.empty((len(quantiles), 0, len(codes)))}
+
+    changes = matrix.pct_change(1)
+    if history is not None:
+        changes = changes[-history:]
+
+    columns, last_values = [], []
+    for code in codes:
+        position = matrix.position(code)
+        if position is None:
+            raise KeyError(f"Unknown series '{code}'")
+        column = changes[:, position]
+        columns.append(column[~np.isnan(column)])
+        observed = matrix.values[:, position]
+        observed = observed[~np.isnan(observed)]
+        last_values.append(observed[-1] if len(observed) else np.nan)
+
+    seeds = np.random.SeedSequence(seed).spawn(len(codes))
+    processes = processes or os.cpu_count() or 1
+    n_chunks = min(processes, len(codes))
+    bounds = np.linspace(0, len(codes), n_chunks + 1).astype(int)
+    chunks = [
+        (columns[a:b], last_values[a:b], seeds[a:b], horizon, n_resamples, block_size, quantiles)
+        for a, b in zip(bounds[:-1], bounds[1:])
+    ]
+
+    if n_chunks == 1:
+        results = [_simulate_chunk(chunks[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=n_chunks) as pool:
+            results = list(pool.map(_simulate_chunk, chunks))
+
+    last_month = matrix.ordinals[-1]
+    return {
+        "months": [month_label(last_month + i) for i in range(1, horizon + 1)],
+        "codes": codes,
+        "quantiles": quantiles,
+        "bands": np.concatenate(results, axis=-1),
+    }
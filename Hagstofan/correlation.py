@@ -0,0 +1,130 @@
+# Hagstofan/correlation.py
+import numpy as np
+
+
+class LeadLag:
+    """
+    Lead/lag cross-correlation of monthly % changes between all series of a matrix.
+
+    Correlations are computed with batched FFTs, one per quantity, over the whole
+    (month x series) change matrix. Missing months are masked out, so each
+    correlation only uses the months where both series are observed.
+
+    Lags are in months. A positive lag L at (leader, target) correlates the leader's
+    change at month t with the target's change at month t + L, i.e. the leader
+    moves L months ahead of the target.
+
+    Example:
+        lead_lag = LeadLag(Panel({"cpi": cpi, "ppi": ppi}), max_lag=12)
+        lead_lag.leaders("cpi:IS011", k=5)
+    """
+
+    def __init__(self, matrix, max_lag: int = 24, min_overlap: int = 24, periods: int = 1):
+        """
+        Args:
+            matrix: An IndexMatrix or Panel (or a data source with `to_matrix()`).
+            max_lag (int): Largest lead or lag, in months, to compute.
+            min_overlap (int): Correlations based on fewer overlapping months are NaN.
+            periods (int): Months over which the % change is taken.
+        """
+        matrix = matrix.to_matrix() if hasattr(matrix, "to_matrix") else matrix
+        self.codes = list(matrix.codes)
+        self.max_lag = max_lag
+        self.min_overlap = min_overlap
+        self.lags = np.arange(-max_lag, max_lag + 1)
+        self._positions = {code: i for i, code in enumerate(self.codes)}
+        self._full = None
+
+        changes = matrix.pct_change(periods)[periods:]
+        observed = ~np.isnan(changes)
+        x = np.where(observed, changes, 0.0)
+        mask = observed.astype(float)
+
+        n_months = max(len(changes), 1)
+        self._nfft = 1 << int(np.ceil(np.log2(n_months + max_lag + 1)))
+        self._fx = np.fft.rfft(x, n=self._nfft, axis=0)
+        self._fm = np.fft.rfft(mask, n=self._nfft, axis=0)
+        self._fxx = np.fft.rfft(x * x, n=self._nfft, axis=0)
+
+    def _xcorr(self, leaders, targets):
+        # sum_t a[t] * b[t + L] for every lag L, leaders on axis 1 and targets on axis 2
+        full = np.fft.irfft(np.conj(leaders)[:, :, None] * targets[:, None, :], n=self._nfft, axis=0)
+        return full[self.lags % self._nfft]
+
+    def _correlate(self, columns):
+        fx, fm, fxx = self._fx[:, columns], self._fm[:, columns], self._fxx[:, columns]
+        n = np.rint(self._xcorr(self._fm, fm))
+        sxy = self._xcorr(self._fx, fx)
+        sa = self._xcorr(self._fx, fm)
+        sb = self._xcorr(self._fm, fx)
+        saa = self._xcorr(self._fxx, fm)
+        sbb = self._xcorr(self._fm, fxx)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = (n * sxy - sa * sb) / np.sqrt((n * saa - sa * sa) * (n * sbb - sb * sb))
+        corr[n < self.min_overlap] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+    def column(self, target: str):
+        """
+        Returns the correlation of every series leading `target` at every lag.
+
+        Returns:
+            np.ndarray: (lag x series) array; row i is for lag `self.lags[i]`.
+        """
+        position = self._positions.get(target)
+        if position is None:
+            raise KeyError(f"Unknown series '{target}'")
+        if self._full is not None:
+            return self._full[:, :, position]
+        return self._correlate([position])[:, :, 0]
+
+    def matrix(self, chunk_size: int = 32):
+        """
+        Returns the full cross-correlation cube, computed once and cached.
+
+        Targets are processed in chunks of `chunk_size` to bound peak memory.
+
+        Returns:
+            np.ndarray: (lag x leader x target) array.
+        """
+        if self._full is None:
+            n = len(self.codes)
+            full = np.empty((len(self.lags), n, n))
+            for start in range(0, n, chunk_size):
+                columns = list(range(start, min(start + chunk_size, n)))
+                full[:, :, start:start + len(columns)] = self._correlate(columns)
+            self._full = full
+        return self._full
+
+    def leaders(self, target: str, k: int = 5, min_lag: int = 1, max_lag=None):
+        """
+        Returns the k series whose changes best lead the target's changes.
+
+        Each candidate is scored by its highest correlation over lags from `min_lag`
+        to `max_lag`; the target itself is excluded.
+
+        Args:
+            target (str): Code of the target series, e.g. "cpi:IS011".
+            k (int): Number of leaders to return.
+            min_lag (int): Smallest lead, in months, to consider.
+            max_lag (int, optional): Largest lead to consider. Defaults to the computed range.
+
+        Returns:
+            list: [{"code": str, "lag": int, "corr": float}, ...] sorted by correlation.
+        """
+        max_lag = self.max_lag if max_lag is None else min(max_lag, self.max_lag)
+        rows = (self.lags >= min_lag) & (self.lags <= max_lag)
+        if not rows.any():
+            return []
+        block = self.column(target)[rows].copy()
+        block[:, self._positions[target]] = np.nan
+        block = np.where(np.isnan(block), -np.inf, block)
+
+        best_row = np.argmax(block, axis=0)
+        best = block[best_row, np.arange(block.shape[1])]
+        order = np.argsort(-best)[:k]
+        lags = self.lags[rows]
+        return [
+            {"code": self.codes[i], "lag": int(lags[best_row[i]]), "corr": round(float(best[i]), 4)}
+            for i in order if np.isfinite(best[i])
+        ]
@@ -0,0 +1,135 @@
+# Hagstofan/crawler.py
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from Hagstofan.base_data_source import BaseDataSource
+
+
+class CatalogCrawler:
+    """
+    Mirrors a PX-Web subtree to a local directory.
+
+    The crawler walks the PX navigation API from `root`, then downloads every
+    table it found on a thread pool. Requests go through the client, so give
+    the client a RateLimiter to keep all threads under one global rate. Each
+    table is written to `<directory>/<table path>.json`, and progress is
+    checkpointed to `<directory>/.checkpoint.json` so an interrupted mirror
+    resumes where it stopped.
+
+    Example:
+        client = APIClient(base_url, rate_limiter=RateLimiter(5))
+        CatalogCrawler(client, 'is/Efnahagur/visitolur', 'mirror').crawl()
+    """
+
+    CHECKPOINT_NAME = ".checkpoint.json"
+
+    def __init__(self, client, root: str, directory: str, workers: int = 4):
+        """
+        Args:
+            client (APIClient): Client used for every request.
+            root (str): PX-Web folder to mirror, e.g. 'is/Efnahagur/visitolur'.
+            directory (str): Local directory to write tables and the checkpoint to.
+            workers (int): Number of concurrent table downloads.
+        """
+        self.client = client
+        self.root = root.strip('/')
+        self.directory = directory
+        self.workers = workers
+        self.checkpoint_path = os.path.join(directory, self.CHECKPOINT_NAME)
+        self._lock = threading.Lock()
+        self.state = self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("root") == self.root:
+                return state
+        return {"root": self.root, "folders": [self.root], "tables": [], "done": [], "failed": {}}
+
+    def _save_checkpoint(self):
+        self._write_json(self.checkpoint_path, self.state)
+
+    @staticmethod
+    def _write_json(path, data):
+        # Write to a temporary file first so an interrupt never leaves a truncated file
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temporary, path)
+
+    def table_path(self, table: str) -> str:
+        """
+        Returns the local file a table is mirrored to.
+        """
+        relative = table[len(self.root):].strip('/') if table.startswith(self.root) else table
+        return os.path.join(self.directory, *relative.split('/')) + ".json"
+
+    def discover(self):
+        """
+        Walks the navigation API below `root` and records every table path.
+
+        Folders still to visit are part of the checkpoint, so discovery also resumes.
+
+        Returns:
+            list: Table paths, e.g. 'is/Efnahagur/visitolur/.../VIS01301.px'.
+        """
+        while self.state["folders"]:
+            folder = self.state["folders"][0]
+            for entry in self.client.get(folder):
+                path = f"{folder}/{entry['id']}"
+                if entry.get("type") == "l":
+                    self.state["folders"].append(path)
+                elif entry.get("type") == "t" and path not in self.state["tables"]:
+                    self.state["tables"].append(path)
+            self.state["folders"].pop(0)
+            self._save_checkpoint()
+        return list(self.state["tables"])
+
+    def download(self, table: str):
+        """
+        Downloads one full table and writes it to `table_path(table)`.
+        """
+        source = BaseDataSource(self.client, table)
+        data = source.get_data({"query": [], "response": {"format": "json"}})
+        self._write_json(self.table_path(table), data)
+
+    def crawl(self, retry_failed: bool = False):
+        """
+        Discovers and downloads every table below `root` that is not mirrored yet.
+
+        Args:
+            retry_failed (bool): Also retry tables that failed in an earlier run.
+
+        Returns:
+            dict: {"downloaded": int, "skipped": int, "failed": {table: error message}}
+        """
+        tables = self.discover()
+        done = set(self.state["done"])
+        if retry_failed:
+            self.state["failed"] = {}
+        pending = [t for t in tables if t not in done and t not in self.state["failed"]]
+
+        downloaded = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.download, table): table for table in pending}
+            for future in as_completed(futures):
+                table = futures[future]
+                with self._lock:
+                    try:
+                        future.result()
+                    except Exception as error:
+                        self.state["failed"][table] = str(error)
+                    else:
+                        self.state["done"].append(table)
+                        downloaded += 1
+                    self._save_checkpoint()
+
+        return {
+            "downloaded": downloaded,
+            "skipped": len(tables) - len(pending),
+            "failed": dict(self.state["failed"]),
+        }
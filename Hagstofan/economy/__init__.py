@@ -1,8 +1,9 @@
 # Hagstofan/economy/__init__.py
 from Hagstofan.api_client import APIClient
 from Hagstofan.economy.cpi import CPI
+from Hagstofan.registry import shared
 
 client = APIClient(base_url='https://px.hagstofa.is:443/pxis/api/v1')
-cpi = CPI(client)
+cpi = shared(CPI, client)
 
 __all__ = ['cpi']
\ No newline at end of file
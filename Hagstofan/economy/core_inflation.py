@@ -0,0 +1,132 @@
+# Hagstofan/economy/core_inflation.py
+import numpy as np
+
+from Hagstofan.economy.isnr_labels import isnr_parents
+from Hagstofan.matrix import IndexMatrix
+
+
+class CoreInflation:
+    """
+    Cross-sectional core-inflation measures over the leaf ISNR codes of the CPI basket.
+
+    For every month the % changes of the leaf codes are ordered once, together with
+    the weights in force that month, in a single vectorized sort over the whole
+    (month x leaf) matrix. Trimmed means, weighted medians and diffusion indices are
+    then read off the sorted cumulative weights for the full history at once.
+    Results are cached per CPI data version and recomputed after a reload.
+
+    Example:
+        core = CoreInflation(cpi)
+        core.trimmed_mean(0.1, 0.1).column("trimmed_mean")
+    """
+
+    def __init__(self, cpi, periods: int = 12):
+        """
+        Args:
+            cpi (CPI): Loaded CPI data source.
+            periods (int): Months over which changes are taken (12 for annual rates, 1 for monthly).
+        """
+        self.cpi = cpi
+        self.periods = periods
+        self._version = None
+        self._cache = {}
+
+    def _prepare(self):
+        # Pin one snapshot so the index and weights come from the same load
+        cpi = self.cpi.snapshot()
+        if self._version == cpi.version and "sorted" in self._cache:
+            return self._cache["sorted"]
+        self._cache = {}
+        self._version = cpi.version
+
+        matrix = cpi.to_matrix()
+        weights = cpi.weights_asof()
+        weighted = [c for i, c in enumerate(matrix.codes) if np.nansum(weights.values[:, i]) > 0]
+        parents = isnr_parents(weighted)
+        has_children = {p for p in parents.values() if p is not None}
+        self.leaves = [c for c in weighted if c not in has_children]
+        columns = [matrix.position(c) for c in self.leaves]
+
+        changes = matrix.pct_change(self.periods)[:, columns]
+        leaf_weights = weights.values[:, columns]
+        valid = ~np.isnan(changes) & ~np.isnan(leaf_weights) & (leaf_weights > 0)
+        leaf_weights = np.where(valid, leaf_weights, 0.0)
+        changes = np.where(valid, changes, np.inf)
+
+        order = np.argsort(changes, axis=1, kind="stable")
+        sorted_changes = np.take_along_axis(changes, order, axis=1)
+        sorted_weights = np.take_along_axis(leaf_weights, order, axis=1)
+        total = sorted_weights.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shares = sorted_weights / total
+        cumulative = np.cumsum(shares, axis=1)
+
+        prepared = (matrix.months, sorted_changes, shares, cumulative, total[:, 0] > 0, valid)
+        self._cache["sorted"] = prepared
+        return prepared
+
+    def _result(self, key, name, compute):
+        cached = self._cache.get(key) if self._version == self.cpi.version else None
+        if cached is None:
+            months, *arrays = self._prepare()
+            cached = IndexMatrix(months, [name], compute(*arrays)[:, None])
+            self._cache[key] = cached
+        return cached
+
+    def trimmed_mean(self, lower: float = 0.1, upper: float = 0.1):
+        """
+        Weighted mean of the changes after removing the `lower` and `upper` weight shares
+        from the tails of each month's distribution.
+
+        Returns:
+            IndexMatrix: One column, "trimmed_mean", NaN for months without data.
+        """
+        def compute(sorted_changes, shares, cumulative, has_data, valid):
+            start = cumulative - shares
+            kept = np.clip(np.minimum(cumulative, 1 - upper) - np.maximum(start, lower), 0, None)
+            kept = np.where(shares > 0, kept, 0.0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = (kept * np.where(kept > 0, sorted_changes, 0.0)).sum(axis=1) / kept.sum(axis=1)
+            return np.where(has_data, values, np.nan)
+        return self._result(("trimmed_mean", lower, upper), "trimmed_mean", compute)
+
+    def weighted_median(self):
+        """
+        Change at the 50% point of each month's weight distribution.
+
+        Returns:
+            IndexMatrix: One column, "weighted_median".
+        """
+        def compute(sorted_changes, shares, cumulative, has_data, valid):
+            position = np.argmax(cumulative >= 0.5, axis=1)
+            values = sorted_changes[np.arange(len(position)), position]
+            return np.where(has_data, values, np.nan)
+        return self._result(("weighted_median",), "weighted_median", compute)
+
+    def diffusion(self, weighted: bool = False):
+        """
+        Share (0-100) of leaf codes whose change is positive in each month.
+
+        Args:
+            weighted (bool): Weight each code by its basket weight instead of counting codes.
+
+        Returns:
+            IndexMatrix: One column, "diffusion".
+        """
+        def compute(sorted_changes, shares, cumulative, has_data, valid):
+            rising = np.isfinite(sorted_changes) & (sorted_changes > 0)
+            if weighted:
+                values = (shares * rising).sum(axis=1) * 100
+            else:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    values = rising.sum(axis=1) / valid.sum(axis=1) * 100
+            return np.where(has_data, values, np.nan)
+        return self._result(("diffusion", weighted), "diffusion", compute)
+
+    def measures(self, lower: float = 0.1, upper: float = 0.1):
+        """
+        Returns the trimmed mean, weighted median and (unweighted) diffusion index together.
+        """
+        parts = [self.trimmed_mean(lower, upper), self.weighted_median(), self.diffusion()]
+        values = np.column_stack([p.values[:, 0] for p in parts])
+        return IndexMatrix(parts[0].months, [p.codes[0] for p in parts], values)
@@ -2,13 +2,24 @@ from Hagstofan.base_data_source import BaseDataSource
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from Hagstofan.economy.isnr_labels import ISNRLabels
+from Hagstofan.matrix import PeriodMatrix, asof_join, month_ordinal
+import numpy as np
 import re
 import statistics
 
 class CPI(BaseDataSource):
+    WEIGHT_ENDPOINT = 'is/Efnahagur/visitolur/1_vnv/2_undirvisitolur/VIS01305.px'
+
     def __init__(self, client):
         super().__init__(client, 'is/Efnahagur/visitolur/1_vnv/2_undirvisitolur/VIS01301.px')
+        self.load()
 
+    def load(self):
+        """
+        Downloads the table and publishes it as a new snapshot.
+        """
+        # Months published since the last load must be part of any split query
+        self._metadata = None
         body = {
             "query": [
                 {
@@ -26,9 +37,14 @@ class CPI(BaseDataSource):
             }
         }
         raw_data = self.get_data(body)
+        snapshot = self._new_snapshot()
+        snapshot._weight_matrix = None
+        snapshot._filled_weight_matrix = None
 
-        self.index = {}  # {(date, isnr): value}
-        self.isnr_values = set()
+        snapshot.index = {}  # {(date, isnr): value}
+        snapshot.missing = {}  # {(date, code): raw value that is not a number}
+        snapshot.duplicates = []
+        snapshot.isnr_values = set()
 
         for entry in raw_data.get("data", []):
             key = entry["key"]
@@ -37,17 +53,20 @@ class CPI(BaseDataSource):
             date_str, _, isnr_value = key[0], key[1], key[2]
             if not re.match(r"^IS\d+$", isnr_value):
                 continue
-            try:
-                value = float(entry["values"][0])
-            except (ValueError, IndexError):
+            value = self.parse_value(entry)
+            if value is None:
+                # PX placeholders such as "." and ".." are kept for the quality report
+                snapshot.missing[(date_str, isnr_value)] = (entry.get("values") or [None])[0]
                 continue
-
-            self.index[(date_str, isnr_value)] = value
-            self.isnr_values.add(isnr_value)
+            if (date_str, isnr_value) in snapshot.index:
+                snapshot.duplicates.append((date_str, isnr_value))
+            snapshot.index[(date_str, isnr_value)] = value
+            snapshot.isnr_values.add(isnr_value)
 
         # Load weight data from the secondary source
-        self.weights = {}  # {(date, isnr): weight}
-        weight_source = BaseDataSource(client, 'is/Efnahagur/visitolur/1_vnv/2_undirvisitolur/VIS01305.px')
+        snapshot.weights = {}  # {(date, isnr): weight}
+        snapshot.missing_weights = {}  # {(date, isnr): raw value that is not a number}
+        weight_source = BaseDataSource(self.client, self.WEIGHT_ENDPOINT)
         weight_body = {
             "query": [],
             "response": {
@@ -62,21 +81,28 @@ class CPI(BaseDataSource):
             isnr_value, date_str = key[0], key[1]
             if not re.match(r"^IS\d+$", isnr_value):
                 continue
-            try:
-                value = float(entry["values"][0])
-            except (ValueError, IndexError):
+            value = self.parse_value(entry)
+            if value is None:
+                snapshot.missing_weights[(date_str, isnr_value)] = (entry.get("values") or [None])[0]
                 continue
-            self.weights[(date_str, isnr_value)] = value
+            snapshot.weights[(date_str, isnr_value)] = value
+        self._publish(snapshot)
+
+    def watched_endpoints(self):
+        return [self.endpoint, self.WEIGHT_ENDPOINT]
 
     def get_current(self, is_nr: str):
-        dates = [d for (d, i) in self.index if i == is_nr]
+        index = self.snapshot().index
+        dates = [d for (d, i) in index if i == is_nr]
         if not dates:
             return {"error": f"No data found for ISO '{is_nr}'"}
         latest = max(dates)
-        return {"month": latest, "value": self.index.get((latest, is_nr))}
+        return {"month": latest, "value": index.get((latest, is_nr))}
 
     def get_12_month_change(self, is_nr: str):
-        dates = [d for (d, i) in self.index if i == is_nr]
+        # Every read comes from one pinned snapshot, even if a reload lands meanwhile
+        index = self.snapshot().index
+        dates = [d for (d, i) in index if i == is_nr]
         if not dates:
             return {"error": f"No data found for IS_NR '{is_nr}'"}
 
@@ -89,8 +115,8 @@ class CPI(BaseDataSource):
         previous_date = latest_date - relativedelta(months=12)
         previous_month_str = previous_date.strftime("%YM%m")
 
-        latest_value = self.index.get((latest_month_str, is_nr))
-        previous_value = self.index.get((previous_month_str, is_nr))
+        latest_value = index.get((latest_month_str, is_nr))
+        previous_value = index.get((previous_month_str, is_nr))
 
         if latest_value is None or previous_value is None:
             return {"error": "Insufficient data for 12-month comparison."}
@@ -117,6 +143,9 @@ class CPI(BaseDataSource):
     def get_label_for_is_nr(self, is_nr: str):
         return ISNRLabels.get(is_nr)
 
+    def get_label(self, code: str) -> str:
+        return ISNRLabels.get(code) or code
+
     def get_weight(self, year_month: str, is_nr: str):
         """
         Returns the weight of the given ISNR for the specified year and month.
@@ -136,6 +165,61 @@ class CPI(BaseDataSource):
         except KeyError:
             return None
 
+    def weight_matrix(self):
+        """
+        Returns the weights as a (weight period x ISNR) PeriodMatrix, built once per snapshot and cached.
+        """
+        snapshot = self.snapshot()
+        if snapshot._weight_matrix is None:
+            snapshot._weight_matrix = PeriodMatrix.from_index(snapshot.weights)
+        return snapshot._weight_matrix
+
+    def filled_weight_matrix(self):
+        """
+        Returns `weight_matrix()` with each ISNR's weight carried forward through the
+        periods that do not revise it, built once per snapshot and cached.
+        """
+        snapshot = self.snapshot()
+        if snapshot._filled_weight_matrix is None:
+            snapshot._filled_weight_matrix = snapshot.weight_matrix().forward_filled()
+        return snapshot._filled_weight_matrix
+
+    def weights_asof(self, months=None):
+        """
+        Returns the weight vector in force for every index month.
+
+        Weights are published at a different cadence from the monthly index, so each
+        month is mapped to the latest weight period starting on or before it.
+
+        Args:
+            months (list, optional): "YYYYMmm" labels. Defaults to the index month axis.
+
+        Returns:
+            IndexMatrix: (month x ISNR) weights, with columns in the same order as `to_matrix()`.
+        """
+        snapshot = self.snapshot()
+        matrix = snapshot.to_matrix()
+        return asof_join(matrix if months is None else months, snapshot.filled_weight_matrix(), codes=matrix.codes,
+                         filled=True)
+
+    def get_weight_asof(self, year_month: str, is_nr: str):
+        """
+        Returns the weight of the given ISNR in force in the specified month.
+
+        Args:
+            year_month (str): The date in format "YYYYMmm", e.g., "2024M01".
+            is_nr (str): The ISNR code, e.g., "IS0112".
+
+        Returns:
+            float | None: The weight value, or None if no weight applies.
+        """
+        weights = self.filled_weight_matrix()
+        row = np.searchsorted(weights.ordinals, month_ordinal(year_month), side="right") - 1
+        column = weights.column(is_nr)
+        if row < 0 or column is None or np.isnan(column[row]):
+            return None
+        return float(column[row])
+
     def get_increase_over_months(self, n_months: int):
         """
         Calculates the % increase in CPI value over the past n_months for each ISNR.
@@ -146,9 +230,10 @@ class CPI(BaseDataSource):
         Returns:
             dict: Mapping from ISNR to % change (float), or error message if data is missing.
         """
+        snapshot = self.snapshot()
         result = {}
-        for isnr in self.isnr_values:
-            dates = [d for (d, i) in self.index if i == isnr]
+        for isnr in snapshot.isnr_values:
+            dates = [d for (d, i) in snapshot.index if i == isnr]
             if not dates:
                 continue
 
@@ -161,8 +246,8 @@ class CPI(BaseDataSource):
             prev_date = latest_date - relativedelta(months=n_months)
             prev_date_str = prev_date.strftime("%YM%m")
 
-            latest_val = self.index.get((latest_date_str, isnr))
-            prev_val = self.index.get((prev_date_str, isnr))
+            latest_val = snapshot.index.get((latest_date_str, isnr))
+            prev_val = snapshot.index.get((prev_date_str, isnr))
 
             if latest_val is not None and prev_val is not None and prev_val != 0:
                 change = ((latest_val - prev_val) / prev_val) * 100
@@ -174,35 +259,38 @@ class CPI(BaseDataSource):
         """
         Computes average and median monthly % change for a given ISNR over the past n_months.
 
+        Months are consecutive calendar months ending at the latest value. A change
+        is only computed between adjacent months that both have values, so gaps in
+        the data lower "months_used" instead of being bridged.
+
         Args:
             is_nr (str): The ISNR code to compute stats for.
             n_months (int): Number of recent months to include.
 
         Returns:
-            dict: {"average": float, "median": float} or {"error": str}
+            dict: {"average": float, "median": float, "months_used": int} or {"error": str}
         """
-        dates = sorted([d for (d, i) in self.index if i == is_nr], reverse=True)
-        if len(dates) < n_months + 1:
+        column = self.to_matrix().column(is_nr)
+        observed = np.flatnonzero(~np.isnan(column)) if column is not None else []
+        if len(observed) == 0 or observed[-1] - observed[0] < n_months:
             return {"error": f"Not enough data for ISNR '{is_nr}'"}
 
-        percent_changes = []
-        for i in range(n_months):
-            d1_str, d2_str = dates[i + 1], dates[i]
-            val1 = self.index.get((d1_str, is_nr))
-            val2 = self.index.get((d2_str, is_nr))
-            if val1 is not None and val2 is not None and val1 != 0:
-                pct_change = ((val2 - val1) / val1) * 100
-                percent_changes.append(pct_change)
+        window = column[observed[-1] - n_months:observed[-1] + 1]
+        previous, current = window[:-1], window[1:]
+        valid = ~np.isnan(previous) & ~np.isnan(current) & (previous != 0)
+        percent_changes = ((current[valid] - previous[valid]) / previous[valid] * 100).tolist()
 
         if not percent_changes:
             return {"error": f"No valid change data for ISNR '{is_nr}'"}
 
         return {
             "average": round(statistics.mean(percent_changes), 2),
-            "median": round(statistics.median(percent_changes), 2)
+            "median": round(statistics.median(percent_changes), 2),
+            "months_used": len(percent_changes)
         }
 
     def __str__(self):
-        total_items = len(self.index)
-        unique_isnr = len(self.isnr_values)
+        snapshot = self.snapshot()
+        total_items = len(snapshot.index)
+        unique_isnr = len(snapshot.isnr_values)
         return f"CPI Data Source with {total_items} entries across {unique_isnr} unique ISNR codes."
\ No newline at end of file
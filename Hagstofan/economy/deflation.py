@@ -0,0 +1,135 @@
+# Hagstofan/economy/deflation.py
+import numpy as np
+
+# Month ordinal (year * 12 + month - 1) of the datetime64 epoch, 1970-01
+EPOCH_ORDINAL = 1970 * 12
+
+# Element-wise for object arrays, which may mix strings, dates and None
+_as_iso = np.frompyfunc(lambda d: d.replace("M", "-") if isinstance(d, str) else d, 1, 1)
+
+
+def month_ordinals(dates):
+    """
+    Converts dates to month ordinals (year * 12 + month - 1) in one vectorized pass.
+
+    Args:
+        dates: Array-like of datetime64 values (any unit), datetime/date objects,
+            ISO date strings ("2024-03-15") or month labels ("2024M03").
+
+    Returns:
+        np.ndarray: int64 month ordinals. Missing dates (NaT) become -1.
+    """
+    dates = np.asarray(dates)
+    if dates.dtype.kind in "US":
+        # "YYYYMmm" labels become "YYYY-mm"; ISO dates never contain an "M"
+        dates = np.char.replace(dates.astype(str), "M", "-").astype("datetime64")
+    elif dates.dtype.kind == "O":
+        dates = _as_iso(dates).astype("datetime64")
+    months = dates.astype("datetime64[M]")
+    ordinals = months.astype(np.int64) + EPOCH_ORDINAL
+    return np.where(np.isnat(months), -1, ordinals)
+
+
+class Deflator:
+    """
+    Converts nominal amounts to real amounts in the prices of a base month.
+
+    The deflation factor (base value / index value) of every month is computed
+    once from the price index, and each call maps its dates to month positions in
+    one vectorized pass and multiplies. Large inputs are processed in chunks of
+    `chunk_size` rows, and `deflate_chunks` streams any number of chunks, so
+    memory stays bounded by the chunk size.
+
+    Example:
+        deflator = Deflator(cpi, "IS00", base="2024M01")
+        real = deflator.deflate(transactions["date"], transactions["amount"])
+    """
+
+    def __init__(self, source, code: str = "IS00", base: str = None, chunk_size: int = 1000000):
+        """
+        Args:
+            source: A loaded data source (anything with `to_matrix()`) or an IndexMatrix.
+            code (str): Series to deflate by, e.g. "IS00" for the CPI or a sub-index.
+            base (str, optional): Base month ("2024M01") or year ("2024", the annual
+                average). Defaults to the latest month with a value.
+            chunk_size (int): Rows processed at a time.
+        """
+        matrix = source.to_matrix() if hasattr(source, "to_matrix") else source
+        column = matrix.column(code)
+        if column is None:
+            raise KeyError(f"Unknown series '{code}'")
+        column = np.asarray(column, dtype=float)
+        if base is None:
+            observed = np.flatnonzero(~np.isnan(column))
+            if not len(observed):
+                raise ValueError(f"No values for '{code}'")
+            base = matrix.months[observed[-1]]
+        base_value = matrix.base_values(base)[matrix.position(code)]
+
+        self.code = code
+        self.base = base
+        self.chunk_size = chunk_size
+        self.first_ordinal = int(matrix.ordinals[0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.factors = base_value / column
+
+    def positions(self, dates):
+        """
+        Returns the month position of every date on the index's month axis (-1 when outside it).
+        """
+        positions = month_ordinals(dates) - self.first_ordinal
+        return np.where((positions >= 0) & (positions < len(self.factors)), positions, -1)
+
+    def deflate(self, dates, amounts, out=None):
+        """
+        Deflates amounts dated `dates` to the base month's prices.
+
+        Args:
+            dates: Dates as accepted by `month_ordinals` (daily or monthly).
+            amounts: Nominal amounts, same length as `dates`.
+            out (np.ndarray, optional): Array to write the result into.
+
+        Returns:
+            np.ndarray: Real amounts; NaN where the date is missing or has no index value.
+        """
+        dates = np.asarray(dates)
+        amounts = np.asarray(amounts, dtype=float)
+        if len(dates) != len(amounts):
+            raise ValueError(f"Got {len(dates)} dates and {len(amounts)} amounts")
+        if out is None:
+            out = np.empty(len(amounts))
+        for start in range(0, len(amounts), self.chunk_size):
+            stop = start + self.chunk_size
+            positions = self.positions(dates[start:stop])
+            factors = np.where(positions >= 0, self.factors[positions], np.nan)
+            np.multiply(amounts[start:stop], factors, out=out[start:stop])
+        return out
+
+    def deflate_frame(self, frame, date_column: str = "date", amount_column: str = "amount",
+                      result_column: str = "real"):
+        """
+        Deflates the amounts of a pandas DataFrame.
+
+        Returns:
+            DataFrame: A copy of `frame` with the real amounts in `result_column`.
+        """
+        real = self.deflate(frame[date_column].to_numpy(), frame[amount_column].to_numpy())
+        return frame.assign(**{result_column: real})
+
+    def deflate_chunks(self, chunks, date_column: str = "date", amount_column: str = "amount",
+                       result_column: str = "real"):
+        """
+        Deflates a stream of chunks lazily, e.g. from `pd.read_csv(..., chunksize=...)`.
+
+        Args:
+            chunks: Iterable of DataFrames or of (dates, amounts) pairs.
+
+        Yields:
+            A deflated DataFrame (see `deflate_frame`) or real amounts array per chunk.
+        """
+        for chunk in chunks:
+            if hasattr(chunk, "columns"):
+                yield self.deflate_frame(chunk, date_column, amount_column, result_column)
+            else:
+                dates, amounts = chunk
+                yield self.deflate(dates, amounts)
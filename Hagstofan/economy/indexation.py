@@ -0,0 +1,221 @@
+# Hagstofan/economy/indexation.py
+import numpy as np
+
+from Hagstofan.economy.deflation import month_ordinals
+from Hagstofan.matrix import month_label, month_ordinal
+
+
+class LoanBook:
+    """
+    Payment schedules of CPI-indexed loans, computed for the whole book at once.
+
+    An indexed loan is repaid as an ordinary annuity or equal-principal loan in
+    real terms, and every amount is then scaled by the index ratio (index in the
+    payment month / base index). Because the real schedule has a closed form,
+    any (loan, payment) cell is computed directly from the loan terms and two
+    index values, so a month of the whole book is one vectorized expression and
+    no loop runs over loans or months. Months after the latest index value use
+    the latest value grown at an assumed annual `inflation`.
+
+    Results per calendar month are cached. `update()` re-reads the index and only
+    drops the months whose index values changed (normally just the newest one
+    and the month after it). Loans whose default base index moved are
+    recomputed in the months that stay cached.
+
+    Example:
+        book = LoanBook(cpi, principal, annual_rate, term, start, annuity=is_annuity)
+        book.month("2024M06")["indexation"].sum()
+    """
+
+    def __init__(self, index, principal, annual_rate, term, start, annuity=True, base_index=None,
+                 code: str = "IS00", inflation: float = 0.0):
+        """
+        Args:
+            index: A loaded CPI data source (anything with `to_matrix()`) or an IndexMatrix.
+            principal (array): Original principal of each loan.
+            annual_rate (array): Real annual interest rate in %, e.g. 3.5.
+            term (array): Number of monthly payments.
+            start (array): Month each loan was paid out, "YYYYMmm" labels or month
+                ordinals. The first payment is due the month after.
+            annuity (bool | array): True for annuity loans, False for equal principal payments.
+            base_index (array, optional): Base index of each loan. Defaults to the
+                index value in its start month.
+            code (str): Index series to use.
+            inflation (float): Assumed annual inflation in % for months without an index value.
+        """
+        self.principal = np.asarray(principal, dtype=float)
+        n_loans = len(self.principal)
+        self.rate = np.broadcast_to(np.asarray(annual_rate, dtype=float) / 1200, n_loans)
+        self.term = np.broadcast_to(np.asarray(term, dtype=np.int64), n_loans)
+        self.annuity = np.broadcast_to(np.asarray(annuity, dtype=bool), n_loans)
+        start = np.asarray(start)
+        self.start = start.astype(np.int64) if start.dtype.kind in "iu" else month_ordinals(start)
+        self.source = index
+        self.code = code
+        self.inflation = inflation
+        self._cache = {}
+        self._read_index()
+        self._default_base = base_index is None
+        if base_index is None:
+            self.base_index = self.index_at(self.start)
+        else:
+            self.base_index = np.broadcast_to(np.asarray(base_index, dtype=float), n_loans)
+
+    def _read_index(self):
+        matrix = self.source.to_matrix() if hasattr(self.source, "to_matrix") else self.source
+        column = matrix.column(self.code)
+        if column is None:
+            raise KeyError(f"Unknown series '{self.code}'")
+        column = np.asarray(column, dtype=float)
+        observed = np.flatnonzero(~np.isnan(column))
+        if not len(observed):
+            raise ValueError(f"No values for '{self.code}'")
+        self.first_ordinal = int(matrix.ordinals[0])
+        self.index_values = column[:observed[-1] + 1].copy()
+
+    def index_at(self, ordinals):
+        """
+        Returns the index value in each month ordinal, projected past the latest value.
+        """
+        positions = np.asarray(ordinals, dtype=np.int64) - self.first_ordinal
+        last = len(self.index_values) - 1
+        inside = self.index_values[np.clip(positions, 0, last)]
+        ahead = self.index_values[last] * (1 + self.inflation / 100) ** (np.maximum(positions - last, 0) / 12)
+        values = np.where(positions > last, ahead, inside)
+        return np.where(positions < 0, np.nan, values)
+
+    def _real_balance(self, loans, payments):
+        # Real (unindexed) balance after `payments` payments, in closed form
+        principal, rate, term = self.principal[loans], self.rate[loans], self.term[loans]
+        paid = np.clip(payments, 0, term)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = (1 + rate) ** term
+            annuity = principal * (growth - (1 + rate) ** paid) / (growth - 1)
+        linear = principal * (1 - paid / term)
+        return np.where(self.annuity[loans] & (rate > 0), annuity, linear)
+
+    def _amounts(self, loans, payments):
+        # Indexed amounts of payment number `payments` (broadcast against `loans`)
+        before = self._real_balance(loans, payments - 1)
+        after = self._real_balance(loans, payments)
+        month = self.start[loans] + payments
+        base = self.base_index[loans]
+        ratio = self.index_at(month) / base
+        previous_ratio = self.index_at(month - 1) / base
+        active = (payments >= 1) & (payments <= self.term[loans])
+
+        principal = np.where(active, (before - after) * ratio, 0.0)
+        interest = np.where(active, before * self.rate[loans] * ratio, 0.0)
+        return {
+            "balance": after * ratio,
+            "installment": principal + interest,
+            "interest": interest,
+            "principal": principal,
+            "indexation": np.where(active, before * (ratio - previous_ratio), 0.0),
+        }
+
+    def month(self, month: str):
+        """
+        Returns every loan's payment in one calendar month.
+
+        Args:
+            month (str): Payment month "YYYYMmm".
+
+        Returns:
+            dict: {"payment": payment number per loan (0 before the first payment),
+                   "balance": indexed balance after the payment,
+                   "installment", "interest", "principal", "indexation": indexed amounts}
+                  as arrays over the loans. Loans not in repayment pay 0.
+        """
+        ordinal = month_ordinal(month)
+        cached = self._cache.get(ordinal)
+        if cached is None:
+            payments = np.maximum(ordinal - self.start, 0)
+            cached = self._amounts(np.arange(len(self.principal)), payments)
+            cached["payment"] = payments
+            for values in cached.values():
+                values.flags.writeable = False
+            self._cache[ordinal] = cached
+        return cached
+
+    def schedule(self, loans=None):
+        """
+        Returns the full payment schedules of some loans.
+
+        The result has one row per loan and one column per payment number, so for
+        a large book request it in batches of loans.
+
+        Args:
+            loans (array | slice, optional): Loans to include. Defaults to all.
+
+        Returns:
+            dict: {"months": payment month labels per cell (empty after maturity),
+                   "balance", "installment", "interest", "principal", "indexation":
+                   (loan x payment) indexed amounts}
+        """
+        loans = np.arange(len(self.principal))[slice(None) if loans is None else loans]
+        width = int(self.term[loans].max()) if len(loans) else 0
+        payments = np.arange(1, width + 1)[None, :]
+        result = self._amounts(loans[:, None], payments)
+        ordinals = self.start[loans][:, None] + payments
+        due = payments <= self.term[loans][:, None]
+        unique, inverse = np.unique(ordinals, return_inverse=True)
+        labels = np.array([month_label(o) for o in unique.tolist()], dtype=object)
+        result["months"] = np.where(due, labels[inverse.reshape(ordinals.shape)], "")
+        return result
+
+    def update(self, index=None):
+        """
+        Re-reads the index, e.g. after a new CPI month is published.
+
+        Only cached months whose index value, or whose previous month's value,
+        changed are recomputed on next use. Loans without an explicit `base_index`
+        also get a new base when their start month was revised or lay past the
+        old latest value (so the base was projected), and their amounts are
+        recomputed in every cached month.
+
+        Args:
+            index (optional): A new data source or IndexMatrix. Defaults to the one given at creation.
+
+        Returns:
+            list: Labels of the months whose index value changed.
+        """
+        if index is not None:
+            self.source = index
+        old_first, old_values = self.first_ordinal, self.index_values
+        self._read_index()
+
+        ordinals = np.arange(min(old_first, self.first_ordinal),
+                             max(old_first + len(old_values), self.first_ordinal + len(self.index_values)))
+        old = np.full(len(ordinals), np.nan)
+        old[old_first - ordinals[0]:old_first - ordinals[0] + len(old_values)] = old_values
+        changed = ordinals[~np.isclose(self.index_at(ordinals), old, equal_nan=True)]
+
+        stale = set(changed.tolist()) | set((changed + 1).tolist())
+        if len(changed):
+            # Cached months past the old latest value were projected from it
+            stale |= {o for o in self._cache if o >= old_first + len(old_values)}
+        for ordinal in stale:
+            self._cache.pop(ordinal, None)
+
+        if self._default_base and len(changed):
+            old_last = old_first + len(old_values) - 1
+            moved = np.flatnonzero(np.isin(self.start, changed) | (self.start > old_last))
+            if len(moved):
+                self.base_index = self.base_index.copy()
+                self.base_index[moved] = self.index_at(self.start[moved])
+                for ordinal, cached in self._cache.items():
+                    self._cache[ordinal] = self._patch(cached, moved)
+        return [month_label(o) for o in changed]
+
+    def _patch(self, cached, loans):
+        # A copy of one cached month with the amounts of `loans` recomputed
+        amounts = self._amounts(loans, cached["payment"][loans])
+        patched = {}
+        for name, values in cached.items():
+            values = values.copy()
+            if name in amounts:
+                values[loans] = amounts[name]
+            values.flags.writeable = False
+            patched[name] = values
+        return patched
@@ -280,4 +280,26 @@ class ISNRLabels:
         Returns:
             str | None: The corresponding label if found, otherwise None.
         """
-        return cls.LABELS.get(isnr_code, None)
\ No newline at end of file
+        return cls.LABELS.get(isnr_code, None)
+
+def isnr_parents(codes):
+    """
+    Builds the ISNR hierarchy over a set of codes.
+
+    The parent of a code is the longest proper prefix that is itself in the set
+    (e.g. "IS04511" -> "IS0451"); top-level groups hang under "IS00".
+
+    Parameters:
+        codes (iterable): ISNR codes, e.g. the keys of ISNRLabels.LABELS.
+
+    Returns:
+        dict: Mapping from each code to its parent code, or None for the root.
+    """
+    known = set(codes)
+    parents = {}
+    for code in known:
+        parent = next((code[:n] for n in range(len(code) - 1, 3, -1) if code[:n] in known), None)
+        if parent is None and code != "IS00" and "IS00" in known:
+            parent = "IS00"
+        parents[code] = parent
+    return parents
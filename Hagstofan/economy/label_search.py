@@ -0,0 +1,190 @@
+# Hagstofan/economy/label_search.py
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+
+from Hagstofan.economy.isnr_labels import ISNRLabels, isnr_parents
+from Hagstofan.economy.production_price_index import ProductionPriceIndex
+from Hagstofan.economy.construction_price_index import ConstructionPriceIndex
+
+# Icelandic letters that do not decompose into a base letter plus an accent
+_FOLD_TABLE = str.maketrans({"þ": "th", "ð": "d", "æ": "ae", "ø": "o"})
+
+
+def fold(text: str) -> str:
+    """
+    Lower-cases text and strips accents, so "Húsasmíði" and "husasmidi" compare equal.
+    """
+    text = text.lower().translate(_FOLD_TABLE)
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _trigrams(text: str):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LabelIndex:
+    """
+    Prebuilt search index over series codes and labels from several sources.
+
+    Labels are accent-folded and indexed by word prefix (a sorted word list
+    searched with bisect) and by trigram, so a keystroke query touches only the
+    postings of its own words and trigrams. Recent queries are memoized.
+
+    Example:
+        index = default_index()
+        index.search("rafm")           # Rafmagn, Rafmagn til lýsingar, ...
+        index.children("IS045")        # ["IS0451", "IS0455"]
+    """
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries (list): (source, code, label) tuples.
+        """
+        self.entries = list(entries)
+        self._codes = [fold(code) for _, code, _ in self.entries]
+        self._labels = [fold(label or "") for _, _, label in self.entries]
+
+        words = []
+        trigrams = defaultdict(set)
+        for i, (code, label) in enumerate(zip(self._codes, self._labels)):
+            for word in set(label.replace(",", " ").replace("-", " ").split()) | {code}:
+                words.append((word, i))
+            for gram in _trigrams(label) | _trigrams(code):
+                trigrams[gram].add(i)
+        words.sort()
+        self._words = words
+        self._word_keys = [w for w, _ in words]
+        self._trigrams = {gram: tuple(ids) for gram, ids in trigrams.items()}
+        self._trigram_counts = [len(_trigrams(label) | _trigrams(code)) for code, label in zip(self._codes, self._labels)]
+
+        self._parents = isnr_parents(code for source, code, _ in self.entries if source == "cpi")
+        self._children = defaultdict(list)
+        for code, parent in sorted(self._parents.items()):
+            if parent is not None:
+                self._children[parent].append(code)
+
+        self._cached_search = lru_cache(maxsize=4096)(self._search)
+
+    @classmethod
+    def from_sources(cls, sources):
+        """
+        Builds an index over the series of loaded data sources.
+
+        Args:
+            sources (dict): Mapping from source name to a data source with `to_matrix()`
+                and `get_label()`, e.g. {"cpi": cpi, "ppi": ppi}.
+        """
+        return cls([
+            (name, code, source.get_label(code))
+            for name, source in sources.items()
+            for code in source.to_matrix().codes
+        ])
+
+    def search(self, query: str, k: int = 10, source=None):
+        """
+        Returns the best matching series for a free-text or code query.
+
+        Exact code matches rank first, then code prefixes, label prefixes, word
+        prefixes and finally fuzzy trigram similarity.
+
+        Args:
+            query (str): Text as typed, e.g. "IS045", "husa" or "rafmagn hiti".
+            k (int): Maximum number of results.
+            source (str, optional): Only return series from this source.
+
+        Returns:
+            list: [{"source": str, "code": str, "label": str, "score": float}, ...]
+        """
+        return [
+            {"source": self.entries[i][0], "code": self.entries[i][1], "label": self.entries[i][2], "score": score}
+            for i, score in self._cached_search(query, k, source)
+        ]
+
+    def _search(self, query, k, source):
+        folded = fold(query).strip()
+        if not folded:
+            return ()
+        scores = defaultdict(float)
+
+        terms = folded.replace(",", " ").split()
+        for term in terms:
+            position = bisect_left(self._word_keys, term)
+            while position < len(self._words) and self._word_keys[position].startswith(term):
+                scores[self._words[position][1]] += 50 / len(terms)
+                position += 1
+
+        grams = _trigrams(folded)
+        overlap = defaultdict(int)
+        for gram in grams:
+            for i in self._trigrams.get(gram, ()):
+                overlap[i] += 1
+        for i, shared in overlap.items():
+            scores[i] += 40 * shared / (len(grams) + self._trigram_counts[i] - shared)
+
+        for i in list(scores):
+            if self._codes[i] == folded:
+                scores[i] += 100
+            elif self._codes[i].startswith(folded):
+                scores[i] += 80
+            if self._labels[i].startswith(folded):
+                scores[i] += 60
+
+        ranked = sorted(
+            (i for i in scores if source is None or self.entries[i][0] == source),
+            key=lambda i: (-scores[i], len(self._codes[i]), self._codes[i]),
+        )
+        return tuple((i, round(scores[i], 2)) for i in ranked[:k])
+
+    def parent(self, is_nr: str):
+        """
+        Returns the nearest ISNR ancestor of a code (e.g. "IS0451" -> "IS045"), or None.
+        """
+        return self._parents.get(is_nr)
+
+    def children(self, is_nr: str):
+        """
+        Returns the ISNR codes directly below a code in the hierarchy.
+        """
+        return list(self._children.get(is_nr, []))
+
+    def ancestors(self, is_nr: str):
+        """
+        Returns the chain of ISNR ancestors of a code, nearest first.
+        """
+        chain = []
+        parent = self.parent(is_nr)
+        while parent is not None:
+            chain.append(parent)
+            parent = self.parent(parent)
+        return chain
+
+    def descendants(self, is_nr: str):
+        """
+        Returns every ISNR code below a code, depth first.
+        """
+        result = []
+        for child in self.children(is_nr):
+            result.append(child)
+            result.extend(self.descendants(child))
+        return result
+
+
+_default_index = None
+
+
+def default_index():
+    """
+    Returns a shared LabelIndex over the built-in ISNR, PPI and construction labels.
+    """
+    global _default_index
+    if _default_index is None:
+        entries = [("cpi", code, label) for code, label in ISNRLabels.LABELS.items()]
+        entries += [("ppi", code, label) for code, label in ProductionPriceIndex.CATEGORY_LABELS.items()]
+        entries += [("bci", code, label) for code, label in ConstructionPriceIndex.CATEGORY_LABELS.items()]
+        _default_index = LabelIndex(entries)
+    return _default_index
@@ -4,9 +4,27 @@ from dateutil.relativedelta import relativedelta
 import re
 
 class ProductionPriceIndex(BaseDataSource):
+    CATEGORY_LABELS = {
+        "PPI" : "Vísitala framleiðsluverðs",
+        "Marine" : "Sjávarafurðir",
+        "Metal" : "Stóriðja",	
+        "Food" : "Matvæli",
+        "Other" : "Annar iðnaður",
+        "Prod_dom" : "Afurðir seldar innanlands",
+        "Prod_exp" : "Útfluttar afurðir",
+        "Prod_exp_exMarine" : "Útfluttar afurðir án sjávarafurða"
+    }
+
     def __init__(self, client):
         super().__init__(client, 'is/Efnahagur/visitolur/5_visitalaframleidslu/framleidsluverd/VIS08000.px')
+        self.load()
 
+    def load(self):
+        """
+        Downloads the table and publishes it as a new snapshot.
+        """
+        # Months published since the last load must be part of any split query
+        self._metadata = None
         body = {
             "query": [
                 {
@@ -25,32 +43,30 @@ class ProductionPriceIndex(BaseDataSource):
         }
 
         raw_data = self.get_data(body)
+        snapshot = self._new_snapshot()
 
-        self.index = {}  # {(date, category): value}
-        self.categories = set()
-
-        self.category_labels = {
-            "PPI" : "Vísitala framleiðsluverðs",
-            "Marine" : "Sjávarafurðir",
-            "Metal" : "Stóriðja",	
-            "Food" : "Matvæli",
-            "Other" : "Annar iðnaður",
-            "Prod_dom" : "Afurðir seldar innanlands",
-            "Prod_exp" : "Útfluttar afurðir",
-            "Prod_exp_exMarine" : "Útfluttar afurðir án sjávarafurða"
-        }
+        snapshot.index = {}  # {(date, category): value}
+        snapshot.missing = {}  # {(date, code): raw value that is not a number}
+        snapshot.duplicates = []
+        snapshot.categories = set()
+
+        snapshot.category_labels = self.CATEGORY_LABELS
 
         for entry in raw_data.get("data", []):
             key = entry.get("key", [])
             if len(key) < 3:
                 continue
             date_str, _, category = key
-            try:
-                value = float(entry["values"][0])
-            except (ValueError, IndexError):
+            value = self.parse_value(entry)
+            if value is None:
+                # PX placeholders such as "." and ".." are kept for the quality report
+                snapshot.missing[(date_str, category)] = (entry.get("values") or [None])[0]
                 continue
-            self.index[(date_str, category)] = value
-            self.categories.add(category)
+            if (date_str, category) in snapshot.index:
+                snapshot.duplicates.append((date_str, category))
+            snapshot.index[(date_str, category)] = value
+            snapshot.categories.add(category)
+        self._publish(snapshot)
 
     def get_label_for_category(self, category: str) -> str:
         """
@@ -64,6 +80,9 @@ class ProductionPriceIndex(BaseDataSource):
         """
         return self.category_labels.get(category, category)
 
+    def get_label(self, code: str) -> str:
+        return self.get_label_for_category(code)
+
     def list_categories(self):
         return sorted(self.categories)
 
@@ -75,15 +94,20 @@ class ProductionPriceIndex(BaseDataSource):
 
     def get_historical_values(self, category: str, months: int = 12):
         """
-        Returns the last X months of values for a given category.
-        Returns a list of (month_str, value) tuples.
+        Returns the values in the last X calendar months for a given category.
+        Returns a list of (month_str, value) tuples; months without a value are left out.
         """
-        dates = sorted([d for (d, c) in self.index if c == category])
+        # Every read comes from one pinned snapshot, even if a reload lands meanwhile
+        index = self.snapshot().index
+        dates = sorted([d for (d, c) in index if c == category])
         if len(dates) == 0:
             return []
-        recent_dates = dates[-months:]
-        return [(d, self.index.get((d, category))) for d in recent_dates if self.index.get((d, category)) is not None]
+        # Last X calendar months, so missing months are not replaced by older ones
+        first = (datetime.strptime(dates[-1], "%YM%m") - relativedelta(months=months - 1)).strftime("%YM%m")
+        recent_dates = [d for d in dates if d >= first]
+        return [(d, index[(d, category)]) for d in recent_dates if index.get((d, category)) is not None]
 
 
     def __str__(self):
-        return f"Production Price Index with {len(self.index)} entries across {len(self.categories)} categories."
+        snapshot = self.snapshot()
+        return f"Production Price Index with {len(snapshot.index)} entries across {len(snapshot.categories)} categories."
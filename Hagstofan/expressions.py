@@ -0,0 +1,255 @@
+# Hagstofan/expressions.py
+import warnings
+import weakref
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from Hagstofan.matrix import IndexMatrix, month_ordinal
+from Hagstofan.panel import Panel
+
+# Every node is interned on its structural key, so building the same
+# subexpression twice yields the same object (common subexpression elimination).
+# A key holds the child nodes themselves, whose hashes are cached, so hashing a
+# key costs O(arity) rather than O(size of the subexpression).
+_nodes = weakref.WeakValueDictionary()
+
+
+class Expr:
+    """
+    A lazy node in a graph of operations over named series.
+
+    Expressions are built with ordinary arithmetic and the methods below; nothing
+    is computed until an Evaluator evaluates them. Structurally identical nodes
+    are shared.
+
+    Example:
+        cpi_ex_housing = (series("cpi", "IS00") * 100 - series("cpi", "IS04") * 30) / 70
+        real_cost = series("bci", "BCI") / series("cpi", "IS00").rebase("2010") * 100
+    """
+
+    __slots__ = ("op", "args", "key", "_hash", "__weakref__")
+
+    def __new__(cls, op, *args):
+        key = (op,) + args
+        node = _nodes.get(key)
+        if node is None:
+            node = super().__new__(cls)
+            node.op = op
+            node.args = args
+            node.key = key
+            node._hash = hash(key)
+            _nodes[key] = node
+        return node
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return isinstance(other, Expr) and self.key == other.key
+
+    def __add__(self, other):
+        return Expr("add", self, _wrap(other))
+
+    def __radd__(self, other):
+        return Expr("add", _wrap(other), self)
+
+    def __sub__(self, other):
+        return Expr("sub", self, _wrap(other))
+
+    def __rsub__(self, other):
+        return Expr("sub", _wrap(other), self)
+
+    def __mul__(self, other):
+        return Expr("mul", self, _wrap(other))
+
+    def __rmul__(self, other):
+        return Expr("mul", _wrap(other), self)
+
+    def __truediv__(self, other):
+        return Expr("div", self, _wrap(other))
+
+    def __rtruediv__(self, other):
+        return Expr("div", _wrap(other), self)
+
+    def __neg__(self):
+        return Expr("mul", const(-1.0), self)
+
+    def rebase(self, base: str):
+        """
+        Rebases so that `base` (a month "2015M01" or a year "2015") equals 100.
+        """
+        return Expr("rebase", self, base)
+
+    def shift(self, months: int = 1):
+        """
+        Lags the series by `months` (values move later in time).
+        """
+        return Expr("shift", self, int(months))
+
+    def rolling(self, window: int, how: str = "mean"):
+        """
+        Trailing rolling "mean" or "sum" over `window` months; NaN until the window is full.
+        """
+        if how not in ("mean", "sum"):
+            raise ValueError(f"Unknown rolling aggregation '{how}', expected 'mean' or 'sum'")
+        return Expr("rolling", self, int(window), how)
+
+    def pct_change(self, months: int = 1):
+        """
+        Percentage change over `months`.
+        """
+        return (self / self.shift(months) - 1) * 100
+
+    def __repr__(self):
+        if self.op == "series":
+            return f"series({self.args[0]!r}, {self.args[1]!r})"
+        if self.op == "const":
+            return repr(self.args[0])
+        return f"{self.op}({', '.join(map(repr, self.args))})"
+
+
+def series(source: str, code: str):
+    """
+    Leaf node for one series of a Panel, e.g. series("cpi", "IS00").
+    """
+    return Expr("series", source, code)
+
+
+def const(value: float):
+    return Expr("const", float(value))
+
+
+def _wrap(value):
+    return value if isinstance(value, Expr) else const(value)
+
+
+def weighted_sum(terms, normalize: bool = False):
+    """
+    Weighted sum of several expressions.
+
+    Args:
+        terms (dict | list): {expr: weight} or [(expr, weight), ...]; weights may be
+            numbers or expressions (e.g. a weight series).
+        normalize (bool): Divide by the sum of the weights (a weighted average).
+
+    Returns:
+        Expr
+    """
+    pairs = list(terms.items()) if isinstance(terms, dict) else list(terms)
+    # Sort by structure so the same terms in another order share one node
+    pairs.sort(key=lambda pair: repr(pair[0].key) + repr(_wrap(pair[1]).key))
+    args = []
+    for expr, weight in pairs:
+        args.extend([expr, _wrap(weight)])
+    return Expr("wsum", normalize, *args)
+
+
+class Evaluator:
+    """
+    Evaluates expressions over a Panel, memoizing every node it computes.
+
+    Each node is one vectorized array operation over the panel's month axis.
+    Intermediate results are kept for the evaluator's lifetime, so evaluating a
+    dashboard of related series computes each shared subexpression only once.
+
+    Example:
+        evaluator = Evaluator(Panel({"cpi": cpi, "bci": construction_index}))
+        evaluator.evaluate({"real_cost": real_cost, "ex_housing": cpi_ex_housing})
+    """
+
+    def __init__(self, panel):
+        """
+        Args:
+            panel: A Panel, or a dict of data sources to build one from.
+        """
+        self.panel = panel if isinstance(panel, Panel) else Panel(panel)
+        self._memo = {}
+
+    def evaluate(self, expressions):
+        """
+        Args:
+            expressions: One Expr, or a dict mapping output names to Exprs.
+
+        Returns:
+            np.ndarray for a single Expr, or an IndexMatrix with one column per name.
+        """
+        if isinstance(expressions, Expr):
+            return self._value(expressions)
+        names = list(expressions)
+        values = np.column_stack([self._value(expressions[name]) for name in names]) if names \
+            else np.empty((len(self.panel.months), 0))
+        return IndexMatrix(self.panel.months, names, values)
+
+    def _value(self, node):
+        # Keyed by the interned node: a cached hash and an identity match
+        result = self._memo.get(node)
+        if result is None:
+            result = self._compute(node)
+            result.flags.writeable = False
+            self._memo[node] = result
+        return result
+
+    def _compute(self, node):
+        op, args = node.op, node.args
+        n_months = len(self.panel.months)
+        if op == "series":
+            column = self.panel.column(f"{args[0]}:{args[1]}")
+            if column is None:
+                raise KeyError(f"Unknown series '{args[0]}:{args[1]}'")
+            return np.array(column, dtype=float)
+        if op == "const":
+            return np.full(n_months, args[0])
+
+        if op in ("add", "sub", "mul", "div"):
+            left, right = self._value(args[0]), self._value(args[1])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if op == "add":
+                    return left + right
+                if op == "sub":
+                    return left - right
+                if op == "mul":
+                    return left * right
+                return left / right
+
+        if op == "wsum":
+            normalize, rest = args[0], args[1:]
+            values = np.vstack([self._value(e) for e in rest[0::2]])
+            weights = np.vstack([self._value(w) for w in rest[1::2]])
+            total = (values * weights).sum(axis=0)
+            if normalize:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    total = total / weights.sum(axis=0)
+            return total
+
+        value = self._value(args[0])
+        if op == "shift":
+            months = args[1]
+            shifted = np.full(n_months, np.nan)
+            if abs(months) >= n_months:
+                # Shifted entirely off the month axis
+                return shifted
+            if months >= 0:
+                shifted[months:] = value[:n_months - months]
+            else:
+                shifted[:months] = value[-months:]
+            return shifted
+        if op == "rolling":
+            window, how = args[1], args[2]
+            rolled = np.full(n_months, np.nan)
+            if 0 < window <= n_months:
+                sums = sliding_window_view(value, window).sum(axis=1)
+                rolled[window - 1:] = sums / window if how == "mean" else sums
+            return rolled
+        if op == "rebase":
+            base = args[1]
+            ordinals = self.panel.ordinals
+            rows = ordinals == month_ordinal(base) if "M" in base else ordinals // 12 == int(base)
+            if not rows.any():
+                raise ValueError(f"Base period '{base}' is outside the data")
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                base_value = np.nanmean(value[rows])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return value / base_value * 100
+        raise ValueError(f"Unknown operation '{op}'")
@@ -0,0 +1,77 @@
+# Hagstofan/freshness.py
+import threading
+
+
+class FreshnessWatcher:
+    """
+    Polls PX-Web table metadata and reloads a data source only when the tables changed.
+
+    Each check costs one small GET of the folder listing per watched table; the
+    table data is downloaded again only when its "updated" timestamp moves.
+
+    Example:
+        watcher = FreshnessWatcher(cpi, interval=3600, callback=lambda source, updated: print(updated))
+        watcher.start()
+    """
+
+    def __init__(self, source, interval: float = 3600, callback=None, reload: bool = True):
+        """
+        Args:
+            source: A loaded data source (CPI, ProductionPriceIndex, ...).
+            interval (float): Seconds between checks when running in the background.
+            callback (callable, optional): Called as `callback(source, updated)` after a change.
+            reload (bool): Call `source.load()` when a change is detected.
+        """
+        self.source = source
+        self.interval = interval
+        self.callback = callback
+        self.reload = reload
+        self.last_updated = source.get_last_updated()
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """
+        Checks the table metadata once and reloads the source if it changed.
+
+        Returns:
+            bool: True if the tables were updated since the last check.
+        """
+        updated = self.source.get_last_updated()
+        if updated is None or updated == self.last_updated:
+            return False
+        if self.reload:
+            self.source.load()
+        self.last_updated = updated
+        if self.callback is not None:
+            self.callback(self.source, updated)
+        return True
+
+    def start(self):
+        """
+        Starts checking every `interval` seconds on a daemon thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="FreshnessWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stops the background thread and waits for it to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+                self.last_error = None
+            except Exception as error:
+                # Keep polling through transient network errors
+                self.last_error = error
@@ -0,0 +1,486 @@
+# Hagstofan/matrix.py
+import warnings
+
+import numpy as np
+
+
+def month_ordinal(year_month: str) -> int:
+    """
+    Converts a PX month label to a running month number.
+
+    Args:
+        year_month (str): The date in format "YYYYMmm", e.g., "2024M01".
+
+    Returns:
+        int: year * 12 + (month - 1).
+    """
+    year, month = year_month.split("M")
+    return int(year) * 12 + int(month) - 1
+
+
+def period_ordinal(period: str) -> int:
+    """
+    Running month number of the first month of a PX period label.
+
+    Accepts months ("2024M01"), quarters ("2024Q1") and years ("2024").
+    """
+    if "M" in period:
+        return month_ordinal(period)
+    if "Q" in period:
+        year, quarter = period.split("Q")
+        return int(year) * 12 + (int(quarter) - 1) * 3
+    return int(period) * 12
+
+
+def month_label(ordinal: int) -> str:
+    """
+    Converts a running month number back to a PX month label ("YYYYMmm").
+    """
+    year, month = divmod(int(ordinal), 12)
+    return f"{year}M{month + 1:02d}"
+
+
+class IndexMatrix:
+    """
+    Dense (month x series) view of a `{(date, code): value}` index dict.
+
+    The month axis is contiguous from the first to the last month found, and
+    months without a value are stored as NaN, so row i is always one month
+    after row i - 1.
+    """
+
+    def __init__(self, months, codes, values):
+        self.months = list(months)
+        self.codes = list(codes)
+        self.values = values
+        self.ordinals = np.array([month_ordinal(m) for m in self.months], dtype=np.int64)
+        self._positions = {code: i for i, code in enumerate(self.codes)}
+        self._rebased = {}
+        self._aggregates = {}
+
+    @classmethod
+    def from_index(cls, index, codes=None):
+        """
+        Builds a matrix from a `{(date, code): value}` dict.
+
+        Args:
+            index (dict): Mapping from (year_month, code) to float.
+            codes (list, optional): Restrict and order the series. Defaults to all codes, sorted.
+
+        Returns:
+            IndexMatrix
+        """
+        if codes is None:
+            codes = sorted({c for (_, c) in index})
+        if not index or not codes:
+            return cls([], codes, np.empty((0, len(codes))))
+
+        first = min(month_ordinal(d) for (d, _) in index)
+        last = max(month_ordinal(d) for (d, _) in index)
+        months = [month_label(o) for o in range(first, last + 1)]
+        positions = {code: i for i, code in enumerate(codes)}
+
+        values = np.full((len(months), len(codes)), np.nan)
+        for (date_str, code), value in index.items():
+            column = positions.get(code)
+            if column is not None:
+                values[month_ordinal(date_str) - first, column] = value
+        return cls(months, codes, values)
+
+    def column(self, code: str):
+        """
+        Returns the values of one series as a 1-D view, or None if the code is unknown.
+        """
+        position = self._positions.get(code)
+        if position is None:
+            return None
+        return self.values[:, position]
+
+    def position(self, code: str):
+        return self._positions.get(code)
+
+    def append(self, month: str, values):
+        """
+        Returns a new matrix with one more month of values (one per series) at the end.
+
+        Args:
+            month (str): The month in format "YYYYMmm"; must follow the last month.
+            values (array-like): Values in the order of `codes`, NaN where missing.
+
+        Returns:
+            IndexMatrix
+        """
+        if len(self.months) and month_ordinal(month) != self.ordinals[-1] + 1:
+            raise ValueError(f"Expected {month_label(self.ordinals[-1] + 1)}, got {month}")
+        row = np.asarray(values, dtype=float).reshape(1, len(self.codes))
+        return IndexMatrix(self.months + [month], self.codes, np.vstack([self.values, row]))
+
+    def pct_change(self, periods: int = 1):
+        """
+        Percentage change over `periods` rows for every series at once.
+
+        Returns:
+            np.ndarray: Array shaped like `values`; the first `periods` rows are NaN.
+
+        Raises:
+            ValueError: If `periods` is negative.
+        """
+        if periods < 0:
+            raise ValueError(f"periods must be non-negative, got {periods}")
+        changes = np.full(self.values.shape, np.nan)
+        if periods < len(self.months):
+            previous = self.values[:-periods] if periods else self.values
+            with np.errstate(divide="ignore", invalid="ignore"):
+                changes[periods:] = (self.values[periods:] / previous - 1) * 100
+        return changes
+
+    def base_values(self, base: str):
+        """
+        Returns the value of every series in the base period.
+
+        Args:
+            base (str): A month ("2015M01") or a year ("2015"), in which case the
+                average over the months of that year is used.
+
+        Returns:
+            np.ndarray: One base value per series (NaN where the base is missing).
+        """
+        if not self.months:
+            raise ValueError(f"Base period '{base}' is outside the data (the matrix is empty)")
+        if "M" in base:
+            ordinal = month_ordinal(base)
+            rows = (self.ordinals == ordinal)
+        else:
+            rows = (self.ordinals // 12 == int(base))
+        if not rows.any():
+            raise ValueError(f"Base period '{base}' is outside the data ({self.months[0]}-{self.months[-1]})")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            return np.nanmean(self.values[rows], axis=0)
+
+    def rebase(self, base: str):
+        """
+        Returns every series rebased so that the base period equals 100.
+
+        The result is a RebasedMatrix that shares the month axis and data of this
+        matrix and only stores one scale factor per series. It is cached per base.
+
+        Args:
+            base (str): A month ("2015M01") or a year ("2015") for a base-year average.
+
+        Returns:
+            RebasedMatrix
+        """
+        view = self._rebased.get(base)
+        if view is None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                factors = 100 / self.base_values(base)
+            view = RebasedMatrix(self, factors, base)
+            self._rebased[base] = view
+        return view
+
+    def resample(self, freq: str = "A", how: str = "mean", incomplete: str = "nan"):
+        """
+        Aggregates the month axis to quarters or years for every series at once.
+
+        Args:
+            freq (str): "Q" for quarters or "A" for calendar years.
+            how (str): "mean" for period averages or "last" for end-of-period values.
+            incomplete (str): What to do with periods that lack some months:
+                "nan" keeps them as NaN, "drop" removes periods that are incomplete
+                for every series, and "partial" aggregates whatever months exist.
+
+        Returns:
+            PeriodMatrix: Cached per (freq, how, incomplete).
+        """
+        key = (freq, how, incomplete)
+        result = self._aggregates.get(key)
+        if result is None:
+            result = self._resample(freq, how, incomplete)
+            self._aggregates[key] = result
+        return result
+
+    def to_quarterly(self, how: str = "mean", incomplete: str = "nan"):
+        return self.resample("Q", how, incomplete)
+
+    def to_annual(self, how: str = "mean", incomplete: str = "nan"):
+        return self.resample("A", how, incomplete)
+
+    def annual_rate(self, how: str = "mean", incomplete: str = "nan"):
+        """
+        Year-over-year % change of the annual aggregates of every series.
+
+        Returns:
+            PeriodMatrix: The first year is NaN.
+        """
+        annual = self.to_annual(how, incomplete)
+        return PeriodMatrix(annual.periods, annual.codes, annual.pct_change(1), annual.counts)
+
+    def _resample(self, freq, how, incomplete):
+        if freq not in ("Q", "A"):
+            raise ValueError(f"Unknown frequency '{freq}', expected 'Q' or 'A'")
+        if how not in ("mean", "last"):
+            raise ValueError(f"Unknown aggregation '{how}', expected 'mean' or 'last'")
+        if incomplete not in ("nan", "drop", "partial"):
+            raise ValueError(f"Unknown incomplete handling '{incomplete}'")
+        length = 3 if freq == "Q" else 12
+        if len(self.months) == 0:
+            return PeriodMatrix([], self.codes, np.empty((0, len(self.codes))), np.empty((0, len(self.codes)), dtype=int))
+
+        # Pad the month axis with NaN rows so it covers whole periods, then fold it
+        first = self.ordinals[0] - self.ordinals[0] % length
+        last = self.ordinals[-1] - self.ordinals[-1] % length + length
+        padded = np.full((last - first, len(self.codes)), np.nan)
+        padded[self.ordinals[0] - first:self.ordinals[-1] - first + 1] = self.values
+        folded = padded.reshape(-1, length, len(self.codes))
+
+        observed = ~np.isnan(folded)
+        counts = observed.sum(axis=1)
+        if how == "mean":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = np.where(observed, folded, 0).sum(axis=1) / counts
+        elif incomplete == "partial":
+            # Last observed month in each period
+            last_seen = length - 1 - np.argmax(observed[:, ::-1, :], axis=1)
+            values = np.take_along_axis(folded, last_seen[:, None, :], axis=1)[:, 0, :]
+        else:
+            values = folded[:, -1, :].copy()
+
+        complete = counts == length
+        if incomplete != "partial":
+            values[~complete] = np.nan
+        starts = np.arange(first, last, length)
+        if incomplete == "drop":
+            keep = complete.any(axis=1)
+            values, counts, starts = values[keep], counts[keep], starts[keep]
+
+        if freq == "Q":
+            periods = [f"{o // 12}Q{o % 12 // 3 + 1}" for o in starts]
+        else:
+            periods = [str(o // 12) for o in starts]
+        return PeriodMatrix(periods, self.codes, values, counts)
+
+    def __len__(self):
+        return len(self.months)
+
+    def __str__(self):
+        return f"IndexMatrix with {len(self.months)} months across {len(self.codes)} series."
+
+
+class RebasedMatrix(IndexMatrix):
+    """
+    An IndexMatrix rebased to another base period.
+
+    Holds a reference to the parent matrix and one factor per series. Single
+    columns are scaled on access; the full `values` array is only built when
+    it is first asked for.
+    """
+
+    def __init__(self, parent, factors, base):
+        self.parent = parent
+        self.factors = factors
+        self.base = base
+        self.months = parent.months
+        self.codes = parent.codes
+        self.ordinals = parent.ordinals
+        self._positions = parent._positions
+        self._rebased = parent._rebased
+        self._aggregates = {}
+        self._values = None
+
+    @property
+    def values(self):
+        if self._values is None:
+            self._values = self.parent.values * self.factors
+        return self._values
+
+    def column(self, code: str):
+        position = self._positions.get(code)
+        if position is None:
+            return None
+        if self._values is not None:
+            return self._values[:, position]
+        return self.parent.values[:, position] * self.factors[position]
+
+    def rebase(self, base: str):
+        return self.parent.rebase(base)
+
+
+class PeriodMatrix:
+    """
+    Quarterly or annual aggregates produced by `IndexMatrix.resample`.
+
+    `counts` holds how many months were observed in each (period, series) cell.
+    """
+
+    def __init__(self, periods, codes, values, counts=None):
+        self.periods = list(periods)
+        self.codes = list(codes)
+        self.values = values
+        self.counts = counts
+        self.ordinals = np.array([period_ordinal(p) for p in self.periods], dtype=np.int64)
+        self._positions = {code: i for i, code in enumerate(self.codes)}
+
+    @classmethod
+    def from_index(cls, index, codes=None):
+        """
+        Builds a matrix from a `{(period, code): value}` dict whose periods need not
+        be monthly or evenly spaced, such as the CPI weights.
+
+        Periods are ordered by their first month.
+        """
+        if codes is None:
+            codes = sorted({c for (_, c) in index})
+        periods = sorted({p for (p, _) in index}, key=period_ordinal)
+        rows = {p: i for i, p in enumerate(periods)}
+        positions = {code: i for i, code in enumerate(codes)}
+
+        values = np.full((len(periods), len(codes)), np.nan)
+        for (period, code), value in index.items():
+            column = positions.get(code)
+            if column is not None:
+                values[rows[period], column] = value
+        return cls(periods, codes, values)
+
+    def asof(self, months, codes=None):
+        """
+        Maps each month to the values in force at that time: the latest period
+        starting on or before it. See `asof_join`.
+        """
+        return asof_join(months, self, codes)
+
+    def forward_filled(self):
+        """
+        Returns a copy where each series keeps its last published value in the
+        periods that do not revise it, so one row holds everything in force.
+        """
+        return PeriodMatrix(self.periods, self.codes, _carry_forward(self.values), self.counts)
+
+    def column(self, code: str):
+        position = self._positions.get(code)
+        if position is None:
+            return None
+        return self.values[:, position]
+
+    def pct_change(self, periods: int = 1):
+        if periods < 0:
+            raise ValueError(f"periods must be non-negative, got {periods}")
+        changes = np.full(self.values.shape, np.nan)
+        if 0 < periods < len(self.periods):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                changes[periods:] = (self.values[periods:] / self.values[:-periods] - 1) * 100
+        return changes
+
+    def __len__(self):
+        return len(self.periods)
+
+    def __str__(self):
+        return f"PeriodMatrix with {len(self.periods)} periods across {len(self.codes)} series."
+
+
+def _carry_forward(values):
+    """
+    Replaces every NaN with the last observed value above it in the same column.
+    Cells before a column's first observation stay NaN.
+    """
+    observed = ~np.isnan(values)
+    latest = np.maximum.accumulate(np.where(observed, np.arange(len(values))[:, None], -1), axis=0)
+    filled = np.take_along_axis(values, np.maximum(latest, 0), axis=0)
+    filled[latest < 0] = np.nan
+    return filled
+
+
+def asof_join(months, source, codes=None, filled=False):
+    """
+    As-of join of a source with any period granularity onto a month axis.
+
+    Every target month gets, for each series, the value of the latest source period
+    that starts on or before it, found with one binary search over the source period
+    axis. Months before a series' first period get NaN.
+
+    Args:
+        months: An IndexMatrix, or a sequence of "YYYYMmm" labels.
+        source: An IndexMatrix or PeriodMatrix, e.g. `PeriodMatrix.from_index(cpi.weights)`.
+        codes (list, optional): Series to return, in order. Defaults to the source codes.
+            Codes missing from the source get NaN columns.
+        filled (bool): The source is already forward-filled (see `PeriodMatrix.forward_filled`),
+            so the carry-forward pass is skipped.
+
+    Returns:
+        IndexMatrix: (month x series) matrix on the target month axis.
+    """
+    labels = months.months if isinstance(months, IndexMatrix) else list(months)
+    targets = np.array([month_ordinal(m) for m in labels], dtype=np.int64)
+    codes = list(source.codes) if codes is None else list(codes)
+
+    rows = np.searchsorted(source.ordinals, targets, side="right") - 1
+    columns = np.array([source._positions.get(c, -1) for c in codes], dtype=np.int64)
+
+    # Carry each series' last published value forward so a period that only
+    # revises some series keeps the others in force
+    n_periods = len(source.ordinals)
+    values = source.values if filled else _carry_forward(source.values)
+
+    # Append a NaN row and column to stand in for "no period yet" and "unknown code"
+    padded = np.full((n_periods + 1, len(source.codes) + 1), np.nan)
+    padded[:-1, :-1] = values
+    values = padded[np.ix_(rows, columns)]
+    return IndexMatrix(labels, codes, values)
+
+
+def chain_link(*segments, link_months=None):
+    """
+    Chain-links index segments published on different bases into one continuous series.
+
+    Each older segment is scaled onto the base of the segment that follows it,
+    using the ratio of the two in a link month where both have values. The newer
+    segment's values are kept from the link month onwards.
+
+    Args:
+        *segments (IndexMatrix): Segments ordered from oldest to newest.
+        link_months (list, optional): Link month between each consecutive pair.
+            Defaults to the first month the two segments share.
+
+    Returns:
+        IndexMatrix: All series of the newest segment on the combined month axis.
+    """
+    if not segments:
+        raise ValueError("chain_link needs at least one segment")
+    linked = segments[0]
+    for i, newer in enumerate(segments[1:]):
+        link = link_months[i] if link_months else None
+        linked = _link_pair(linked, newer, link)
+    return linked
+
+
+def _link_pair(older, newer, link=None):
+    if link is None:
+        shared = np.intersect1d(older.ordinals, newer.ordinals)
+        if len(shared) == 0:
+            raise ValueError("Segments do not overlap; a link month is required")
+        link_ordinal = shared[0]
+    else:
+        link_ordinal = month_ordinal(link)
+
+    first = min(older.ordinals[0], newer.ordinals[0])
+    last = max(older.ordinals[-1], newer.ordinals[-1])
+    values = np.full((last - first + 1, len(newer.codes)), np.nan)
+
+    old_columns = np.array([older.position(c) if older.position(c) is not None else -1 for c in newer.codes])
+    has_old = old_columns >= 0
+    old_link = older.ordinals == link_ordinal
+    new_link = newer.ordinals == link_ordinal
+    if not old_link.any() or not new_link.any():
+        raise ValueError(f"Link month '{month_label(link_ordinal)}' is missing from a segment")
+
+    old_values = older.values[:, old_columns[has_old]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = newer.values[new_link][0, has_old] / old_values[old_link][0]
+
+    before = older.ordinals < link_ordinal
+    rows = older.ordinals[before] - first
+    values[np.ix_(rows, np.flatnonzero(has_old))] = old_values[before] * ratio
+
+    after = newer.ordinals >= link_ordinal
+    values[newer.ordinals[after] - first] = newer.values[after]
+    return IndexMatrix([month_label(o) for o in range(first, last + 1)], newer.codes, values)
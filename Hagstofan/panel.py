@@ -0,0 +1,174 @@
+# Hagstofan/panel.py
+import numpy as np
+
+from Hagstofan.matrix import IndexMatrix, month_label, month_ordinal
+
+
+class Panel(IndexMatrix):
+    """
+    Several loaded data sources on one common month axis.
+
+    All series live in a single contiguous (month x series) float matrix, with the
+    series of each source stored next to each other. Series are addressed as
+    "source:code" (e.g. "cpi:IS00", "ppi:Food") and described by the `series`
+    metadata table.
+
+    Example:
+        panel = Panel({"cpi": cpi, "ppi": ppi, "bci": construction_index})
+        panel.select("ppi").corr()
+    """
+
+    def __init__(self, sources):
+        """
+        Args:
+            sources (dict): Mapping from a short source name to a loaded data source
+                (CPI, ProductionPriceIndex, ConstructionPriceIndex) or an IndexMatrix.
+        """
+        matrices = {name: (s.to_matrix() if hasattr(s, "to_matrix") else s) for name, s in sources.items()}
+        filled = [m for m in matrices.values() if len(m)]
+        if filled:
+            first = min(m.ordinals[0] for m in filled)
+            last = max(m.ordinals[-1] for m in filled)
+        else:
+            first, last = 0, -1
+
+        n_series = sum(len(m.codes) for m in matrices.values())
+        values = np.full((last - first + 1, n_series), np.nan)
+        codes, series, slices = [], [], {}
+        start = 0
+        for name, matrix in matrices.items():
+            source = sources[name]
+            stop = start + len(matrix.codes)
+            if len(matrix):
+                values[matrix.ordinals[0] - first:matrix.ordinals[-1] - first + 1, start:stop] = matrix.values
+            for code in matrix.codes:
+                codes.append(f"{name}:{code}")
+                label = source.get_label(code) if hasattr(source, "get_label") else code
+                series.append({"source": name, "code": code, "label": label})
+            slices[name] = slice(start, stop)
+            start = stop
+
+        super().__init__([month_label(o) for o in range(first, last + 1)], codes, values)
+        self.series = series
+        self._slices = slices
+
+    @classmethod
+    def _from_parts(cls, months, codes, values, series, slices):
+        panel = cls.__new__(cls)
+        IndexMatrix.__init__(panel, months, codes, values)
+        panel.series = series
+        panel._slices = slices
+        return panel
+
+    @property
+    def sources(self):
+        return list(self._slices)
+
+    def select(self, source=None, codes=None):
+        """
+        Selects series by source and/or by code.
+
+        Selecting whole sources (or any run of adjacent columns) returns a Panel whose
+        `values` is a view into this panel's matrix; scattered codes are gathered into
+        a new matrix.
+
+        Args:
+            source (str | list, optional): Source name(s), e.g. "cpi" or ["cpi", "ppi"].
+            codes (list, optional): Series codes, either "source:code" or a bare code
+                within the selected source(s).
+
+        Returns:
+            Panel
+        """
+        names = [source] if isinstance(source, str) else (source or self.sources)
+        columns = []
+        for name in names:
+            if name not in self._slices:
+                raise KeyError(f"Unknown source '{name}'")
+            columns.extend(range(self._slices[name].start, self._slices[name].stop))
+        if codes is not None:
+            wanted = set(codes)
+            columns = [i for i in columns
+                       if self.codes[i] in wanted or self.series[i]["code"] in wanted]
+        return self._take_columns(columns)
+
+    def between(self, start=None, end=None):
+        """
+        Returns the months from `start` to `end` (inclusive, "YYYYMmm") as a view.
+        """
+        lo = 0 if start is None else max(month_ordinal(start) - self.ordinals[0], 0)
+        hi = len(self.months) if end is None else max(month_ordinal(end) - self.ordinals[0] + 1, 0)
+        slices = dict(self._slices)
+        return Panel._from_parts(self.months[lo:hi], self.codes, self.values[lo:hi], self.series, slices)
+
+    def _take_columns(self, columns):
+        if columns and columns == list(range(columns[0], columns[-1] + 1)):
+            values = self.values[:, columns[0]:columns[-1] + 1]
+        else:
+            values = self.values[:, columns]
+        series = [self.series[i] for i in columns]
+        slices = {}
+        for position, meta in enumerate(series):
+            current = slices.get(meta["source"])
+            slices[meta["source"]] = slice(current.start if current else position, position + 1)
+        return Panel._from_parts(self.months, [self.codes[i] for i in columns], values, series, slices)
+
+    def corr(self, changes: bool = True):
+        """
+        Pairwise correlation between all series, using the months where both are observed.
+
+        Args:
+            changes (bool): Correlate monthly % changes (default) instead of index levels.
+
+        Returns:
+            np.ndarray: (series x series) correlation matrix.
+        """
+        data = self.pct_change(1) if changes else self.values
+        observed = (~np.isnan(data)).astype(float)
+        x = np.where(observed > 0, data, 0.0)
+
+        n = observed.T @ observed
+        sx = x.T @ observed
+        sxx = (x * x).T @ observed
+        sxy = x.T @ x
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = n * sxy - sx * sx.T
+            var = n * sxx - sx * sx
+            return cov / np.sqrt(var * var.T)
+
+    def regress(self, target: str, regressors, changes: bool = True):
+        """
+        Ordinary least squares of one series on others over the months where all are observed.
+
+        Args:
+            target (str): "source:code" of the dependent series.
+            regressors (list): "source:code" of the explanatory series.
+            changes (bool): Use monthly % changes (default) instead of index levels.
+
+        Returns:
+            dict: {"intercept": float, "coefficients": {code: float}, "r2": float, "n": int}
+        """
+        data = self.pct_change(1) if changes else self.values
+        columns = [self.position(c) for c in [target] + list(regressors)]
+        if None in columns:
+            missing = ([target] + list(regressors))[columns.index(None)]
+            raise KeyError(f"Unknown series '{missing}'")
+        block = data[:, columns]
+        block = block[~np.isnan(block).any(axis=1)]
+        if len(block) <= len(regressors) + 1:
+            return {"error": "Not enough overlapping observations for regression."}
+
+        y = block[:, 0]
+        x = np.column_stack([np.ones(len(block)), block[:, 1:]])
+        beta, *_ = np.linalg.lstsq(x, y, rcond=None)
+        residuals = y - x @ beta
+        total = ((y - y.mean()) ** 2).sum()
+        return {
+            "intercept": float(beta[0]),
+            "coefficients": dict(zip(regressors, map(float, beta[1:]))),
+            "r2": float(1 - (residuals ** 2).sum() / total) if total else float("nan"),
+            "n": len(block),
+        }
+
+    def __str__(self):
+        return f"Panel with {len(self.months)} months across {len(self.codes)} series from {len(self._slices)} sources."
@@ -0,0 +1,172 @@
+# Hagstofan/plotting.py
+import numpy as np
+
+from Hagstofan.matrix import month_ordinal
+
+
+def lttb(values, points: int):
+    """
+    Largest-Triangle-Three-Buckets downsampling of every column of a monthly matrix.
+
+    The month axis is cut into `points - 2` buckets and, from each bucket, the point
+    forming the largest triangle with the point kept from the previous bucket and
+    the average of the next bucket is kept. This preserves peaks, troughs and turns
+    that plain decimation drops. Each step works on one bucket of all series at
+    once. Missing values (NaN) are never picked while a series has data in the
+    bucket.
+
+    Args:
+        values (np.ndarray): (month x series) values on a contiguous month axis.
+        points (int): Number of points to keep per series.
+
+    Returns:
+        np.ndarray: (points x series) row indices of the kept points, increasing per series.
+            All rows are kept when `points` is less than 3 or not below the number of months.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    n_months, n_series = values.shape
+    if points < 3 or points >= n_months:
+        return np.repeat(np.arange(n_months)[:, None], n_series, axis=1)
+
+    indices = np.empty((points, n_series), dtype=int)
+    indices[0] = 0
+    indices[-1] = n_months - 1
+    every = (n_months - 2) / (points - 2)
+    columns = np.arange(n_series)
+    kept = np.zeros(n_series, dtype=int)
+
+    for bucket in range(points - 2):
+        start = int(bucket * every) + 1
+        stop = int((bucket + 1) * every) + 1
+        next_stop = min(int((bucket + 2) * every) + 1, n_months)
+
+        # Average of the next bucket (the last point for the final bucket)
+        following = values[stop:next_stop] if stop < next_stop else values[-1:]
+        with np.errstate(invalid="ignore"):
+            count = (~np.isnan(following)).sum(axis=0)
+            average_y = np.where(count > 0, np.nansum(following, axis=0) / np.maximum(count, 1), np.nan)
+        average_x = (stop + next_stop - 1) / 2 if stop < next_stop else n_months - 1
+
+        previous_x = kept
+        previous_y = values[kept, columns]
+        # Without a previous or next value, compare against whichever one is known
+        previous_y = np.where(np.isnan(previous_y), average_y, previous_y)
+        average_y = np.where(np.isnan(average_y), previous_y, average_y)
+
+        x = np.arange(start, stop)[:, None]
+        y = values[start:stop]
+        area = np.abs((previous_x - average_x) * (y - previous_y) - (previous_x - x) * (average_y - previous_y))
+        area = np.where(np.isnan(y), -np.inf, np.nan_to_num(area, nan=0.0))
+        kept = start + np.argmax(area, axis=0)
+        indices[bucket + 1] = kept
+    return indices
+
+
+class SeriesPlotter:
+    """
+    Plots many monthly series at once without drawing every point.
+
+    Series are reduced with LTTB (see `lttb`) to about one point per horizontal
+    pixel before being handed to matplotlib, so plotting all ISNR series since 1997
+    draws a few hundred points per line instead of every month. The reduction is
+    computed for the whole matrix in one pass and cached per target width; it is
+    recomputed when a data source publishes new data. matplotlib is imported only
+    when something is plotted.
+
+    Example:
+        plotter = SeriesPlotter(cpi)
+        plotter.plot(["IS00", "IS0451"])
+        plotter.plot(width=400)          # every series, 400 points each
+    """
+
+    def __init__(self, source):
+        """
+        Args:
+            source: A loaded data source (anything with `to_matrix()`), a Panel or an IndexMatrix.
+        """
+        self.source = source
+        self._matrix = None
+        self._cache = {}
+
+    def matrix(self):
+        """
+        Returns the matrix being plotted, clearing the cache if the source has new data.
+        """
+        matrix = self.source.to_matrix() if hasattr(self.source, "to_matrix") else self.source
+        if matrix is not self._matrix:
+            self._matrix = matrix
+            self._cache = {}
+        return matrix
+
+    def label(self, code: str) -> str:
+        """
+        Returns the legend label of a series.
+        """
+        matrix = self.matrix()
+        if hasattr(matrix, "series"):
+            return matrix.series[matrix.position(code)]["label"]
+        if hasattr(self.source, "get_label"):
+            return self.source.get_label(code)
+        return code
+
+    def downsample(self, width: int = 800, start: str = None):
+        """
+        Reduces every series of the matrix to `width` points.
+
+        Args:
+            width (int): Points to keep per series, typically the plot width in pixels.
+            start (str, optional): First month "YYYYMmm" to include.
+
+        Returns:
+            dict: {"codes": [...], "x": (point x series) dates as fractional years,
+                   "values": (point x series) values}
+        """
+        matrix = self.matrix()
+        key = (width, start)
+        cached = self._cache.get(key)
+        if cached is None:
+            first = 0
+            if start is not None and len(matrix):
+                first = min(max(month_ordinal(start) - matrix.ordinals[0], 0), len(matrix))
+            values = np.asarray(matrix.values)[first:]
+            indices = lttb(values, width) if len(values) else np.empty((0, len(matrix.codes)), dtype=int)
+            cached = {
+                "codes": list(matrix.codes),
+                "x": matrix.ordinals[first:][indices] / 12,
+                "values": np.take_along_axis(values, indices, axis=0),
+            }
+            self._cache[key] = cached
+        return cached
+
+    def plot(self, codes=None, width: int = None, start: str = None, ax=None, **kwargs):
+        """
+        Plots series, downsampled to the width of the axes.
+
+        Args:
+            codes (list, optional): Series codes to plot. Defaults to every series.
+            width (int, optional): Points per series. Defaults to the axes width in pixels.
+            start (str, optional): First month "YYYYMmm" to plot.
+            ax (matplotlib.axes.Axes, optional): Axes to draw on. Defaults to the current axes.
+            **kwargs: Passed on to `ax.plot` for every line.
+
+        Returns:
+            matplotlib.axes.Axes: The axes drawn on.
+        """
+        try:
+            import matplotlib.pyplot as plt
+        except ImportError as error:
+            raise ImportError("Plotting requires matplotlib: pip install matplotlib") from error
+
+        ax = ax if ax is not None else plt.gca()
+        if width is None:
+            width = max(int(ax.get_window_extent().width), 3)
+        reduced = self.downsample(width, start)
+        positions = {code: i for i, code in enumerate(reduced["codes"])}
+        for code in reduced["codes"] if codes is None else codes:
+            if code not in positions:
+                raise KeyError(f"Unknown series '{code}'")
+            column = positions[code]
+            ax.plot(reduced["x"][:, column], reduced["values"][:, column], label=self.label(code), **kwargs)
+        return ax
@@ -0,0 +1,111 @@
+# Hagstofan/quality.py
+import re
+
+import numpy as np
+
+from Hagstofan.matrix import IndexMatrix, month_ordinal
+
+MONTH_PATTERN = re.compile(r"^\d{4}M(0[1-9]|1[0-2])$")
+
+
+class QualityReport:
+    """
+    Data-quality bitmaps and findings for a loaded `{(date, code): value}` index.
+
+    Attributes:
+        months, codes: Axes of the bitmaps (contiguous months, all series seen).
+        observed: True where a value was loaded.
+        placeholder: True where PX returned a non-numeric placeholder ("." or "..").
+        gap: True where a month inside a series' observed span has no value.
+        duplicates: Keys that appeared more than once in the response.
+        invalid_months: Date labels that are not "YYYYMmm".
+        non_monotonic: Series whose months did not arrive in increasing order.
+        missing_weights: (period, code) keys whose weight was a placeholder. Weights
+            are kept out of the bitmaps since their periods are not the index months.
+    """
+
+    def __init__(self, index, missing=None, duplicates=None, missing_weights=None):
+        missing = missing or {}
+        self.duplicates = list(duplicates or [])
+        self.missing_weights = sorted(missing_weights or [])
+        self.invalid_months = sorted({d for (d, _) in list(index) + list(missing) if not MONTH_PATTERN.match(d)})
+        valid_index = {k: v for k, v in index.items() if MONTH_PATTERN.match(k[0])}
+        valid_missing = [k for k in missing if MONTH_PATTERN.match(k[0])]
+
+        codes = sorted({c for (_, c) in valid_index} | {c for (_, c) in valid_missing})
+        axis = dict(valid_index)
+        axis.update({k: np.nan for k in valid_missing})
+        matrix = IndexMatrix.from_index(axis, codes)
+        self.months = matrix.months
+        self.codes = matrix.codes
+
+        self.observed = np.zeros((len(self.months), len(self.codes)), dtype=bool)
+        self.placeholder = np.zeros_like(self.observed)
+        if len(self.months):
+            first = matrix.ordinals[0]
+            positions = {code: i for i, code in enumerate(self.codes)}
+            if valid_index:
+                rows, columns = self._cells(valid_index, first, positions)
+                self.observed[rows, columns] = True
+            if valid_missing:
+                rows, columns = self._cells(valid_missing, first, positions)
+                self.placeholder[rows, columns] = True
+
+        # A gap is an unobserved month between a series' first and last observation
+        seen_before = np.logical_or.accumulate(self.observed, axis=0)
+        seen_after = np.logical_or.accumulate(self.observed[::-1], axis=0)[::-1]
+        self.gap = seen_before & seen_after & ~self.observed
+
+        self.non_monotonic = self._non_monotonic(valid_index)
+
+    @staticmethod
+    def _cells(keys, first, positions):
+        rows = np.fromiter((month_ordinal(d) - first for (d, _) in keys), dtype=np.int64, count=len(keys))
+        columns = np.fromiter((positions[c] for (_, c) in keys), dtype=np.int64, count=len(keys))
+        return rows, columns
+
+    def _non_monotonic(self, index):
+        # Dicts keep insertion order, i.e. the order the server sent the rows in
+        if not index:
+            return []
+        codes = np.array([c for (_, c) in index])
+        ordinals = np.fromiter((month_ordinal(d) for (d, _) in index), dtype=np.int64, count=len(index))
+        order = np.argsort(codes, kind="stable")
+        codes, ordinals = codes[order], ordinals[order]
+        same_series = codes[1:] == codes[:-1]
+        backwards = same_series & (np.diff(ordinals) <= 0)
+        return sorted(set(codes[1:][backwards].tolist()))
+
+    @property
+    def is_clean(self):
+        return not (self.placeholder.any() or self.gap.any() or self.duplicates
+                    or self.invalid_months or self.non_monotonic or self.missing_weights)
+
+    def summary(self):
+        """
+        Returns a compact dict of the findings, listing only series with problems.
+        """
+        placeholders = self.placeholder.sum(axis=0)
+        gaps = self.gap.sum(axis=0)
+        by_series = {
+            code: {"placeholders": int(placeholders[i]), "gaps": int(gaps[i])}
+            for i, code in enumerate(self.codes) if placeholders[i] or gaps[i]
+        }
+        return {
+            "months": len(self.months),
+            "series": len(self.codes),
+            "observed": int(self.observed.sum()),
+            "placeholders": int(placeholders.sum()),
+            "gaps": int(gaps.sum()),
+            "duplicates": len(self.duplicates),
+            "invalid_months": self.invalid_months,
+            "non_monotonic": self.non_monotonic,
+            "missing_weights": len(self.missing_weights),
+            "by_series": by_series,
+        }
+
+    def __str__(self):
+        s = self.summary()
+        return (f"Quality report: {s['observed']} values across {s['series']} series, "
+                f"{s['placeholders']} placeholders, {s['gaps']} gaps, {s['duplicates']} duplicates, "
+                f"{s['missing_weights']} missing weights.")
@@ -0,0 +1,89 @@
+# Hagstofan/registry.py
+import threading
+from concurrent.futures import Future
+
+_loads = {}  # {(class, base_url, args): Future}
+_lock = threading.Lock()
+
+
+def _key(cls, client, args, kwargs):
+    return (cls, client.base_url, args, tuple(sorted(kwargs.items())))
+
+
+def shared(cls, client, *args, **kwargs):
+    """
+    Returns the process-wide loaded instance of a data source, loading it on first use.
+
+    Every caller asking for the same (data source, server, arguments) gets the same
+    frozen instance. When several threads ask at the same time, only the first one
+    downloads; the others wait for that in-flight load and share its result. A
+    failed load is not cached, so the next caller tries again.
+
+    Example:
+        cpi = shared(CPI, client)
+
+    Args:
+        cls: The data source class, e.g. CPI or ConstructionPriceIndex.
+        client (APIClient): Client for the PX-Web server.
+        *args, **kwargs: Extra constructor arguments, part of the sharing key.
+
+    Returns:
+        The shared, read-only data source.
+    """
+    key = _key(cls, client, args, kwargs)
+    with _lock:
+        future = _loads.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _loads[key] = future
+
+    if owner:
+        try:
+            instance = cls(client, *args, **kwargs)
+            instance.freeze()
+        except BaseException as error:
+            with _lock:
+                if _loads.get(key) is future:
+                    del _loads[key]
+            future.set_exception(error)
+            raise
+        future.set_result(instance)
+    return future.result()
+
+
+def refresh(cls, client, *args, **kwargs):
+    """
+    Reloads a shared data source.
+
+    A loaded shared instance is reloaded in place: it publishes a new snapshot,
+    so every holder sees the new data while readers that pinned the previous
+    snapshot keep using it unchanged. Otherwise a new instance is loaded and
+    made the shared one.
+
+    Returns:
+        The shared data source.
+    """
+    key = _key(cls, client, args, kwargs)
+    with _lock:
+        future = _loads.get(key)
+    if future is not None and future.done() and future.exception() is None:
+        instance = future.result()
+        instance.load()
+        return instance
+
+    instance = cls(client, *args, **kwargs)
+    instance.freeze()
+    future = Future()
+    future.set_result(instance)
+    with _lock:
+        _loads[key] = future
+    return instance
+
+
+def clear():
+    """
+    Forgets all shared instances; the next `shared` call loads again.
+    """
+    with _lock:
+        _loads.clear()
@@ -0,0 +1,160 @@
+# Hagstofan/seasonal.py
+from collections import deque
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from Hagstofan.matrix import IndexMatrix, month_label, month_ordinal
+
+# Centered 2x12 moving average: half weight on the two end months
+TREND_WEIGHTS = np.r_[0.5, np.ones(11), 0.5] / 12
+HALF_WINDOW = 6
+
+
+class SeasonalAdjuster:
+    """
+    Classical moving-average seasonal decomposition of every series of a matrix at once.
+
+    The trend is a centered 2x12 moving average; the seasonal factor of each
+    calendar month is the average ratio (or difference) of the series to its trend
+    in that month, normalized over the year. The per-month sums behind the factors
+    are kept, so appending a month only adds the one newly centred month to them
+    instead of decomposing the whole history again. Appended months are only
+    joined onto `matrix` when it is next read.
+
+    Example:
+        adjuster = SeasonalAdjuster(cpi)
+        adjuster.adjusted().column("IS03")
+    """
+
+    def __init__(self, matrix, model: str = "multiplicative"):
+        """
+        Args:
+            matrix: An IndexMatrix or Panel (or a data source with `to_matrix()`).
+            model (str): "multiplicative" (default, for index levels) or "additive".
+        """
+        if model not in ("multiplicative", "additive"):
+            raise ValueError(f"Unknown model '{model}', expected 'multiplicative' or 'additive'")
+        self._matrix = matrix.to_matrix() if hasattr(matrix, "to_matrix") else matrix
+        self.model = model
+        self._factors = None
+        self._adjusted = None
+        # Months appended since `matrix` was last built, and the last full trend window
+        self._pending_months = []
+        self._pending_values = []
+        self._window = deque(self._matrix.values[-len(TREND_WEIGHTS):], maxlen=len(TREND_WEIGHTS))
+        self._last_ordinal = int(self._matrix.ordinals[-1]) if len(self._matrix) else None
+
+        n_series = len(self._matrix.codes)
+        self._sums = np.zeros((12, n_series))
+        self._counts = np.zeros((12, n_series))
+        trend = self._trend(self._matrix.values)
+        rows = np.arange(HALF_WINDOW, HALF_WINDOW + len(trend))
+        self._accumulate(self._matrix.ordinals[rows] % 12, self._detrend(self._matrix.values[rows], trend))
+
+    @property
+    def matrix(self):
+        """
+        The raw series, including every appended month.
+        """
+        if self._pending_months:
+            self._matrix = IndexMatrix(self._matrix.months + self._pending_months, self._matrix.codes,
+                                       np.vstack([self._matrix.values] + self._pending_values))
+            self._pending_months = []
+            self._pending_values = []
+        return self._matrix
+
+    def _trend(self, values):
+        if len(values) < len(TREND_WEIGHTS):
+            return np.empty((0, values.shape[1]))
+        windows = sliding_window_view(values, len(TREND_WEIGHTS), axis=0)
+        return windows @ TREND_WEIGHTS
+
+    def _detrend(self, values, trend):
+        if self.model == "additive":
+            return values - trend
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return values / trend
+
+    def _accumulate(self, calendar_months, ratios):
+        observed = ~np.isnan(ratios)
+        np.add.at(self._sums, calendar_months, np.where(observed, ratios, 0.0))
+        np.add.at(self._counts, calendar_months, observed)
+        self._factors = None
+        self._adjusted = None
+
+    @property
+    def factors(self):
+        """
+        Seasonal factors as a (calendar month x series) array; row 0 is January.
+
+        Computed from the accumulated sums on first use and cached until new data arrives.
+        """
+        if self._factors is None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                raw = self._sums / self._counts
+            with warnings.catch_warnings():
+                # Series with no trend yet average an all-NaN column
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                mean = np.nanmean(raw, axis=0)
+            if self.model == "additive":
+                self._factors = raw - mean
+            else:
+                self._factors = raw / mean
+            neutral = 0.0 if self.model == "additive" else 1.0
+            # Series without a full year of trend get no seasonal correction
+            self._factors[:, (self._counts == 0).any(axis=0)] = neutral
+        return self._factors
+
+    def adjusted(self):
+        """
+        Returns the seasonally adjusted series as an IndexMatrix, cached until new data arrives.
+        """
+        if self._adjusted is None:
+            matrix = self.matrix
+            self._adjusted = IndexMatrix(matrix.months, matrix.codes, self._adjust(matrix.values, matrix.ordinals))
+        return self._adjusted
+
+    def _adjust(self, values, ordinals):
+        seasonal = self.factors[ordinals % 12]
+        if self.model == "additive":
+            return values - seasonal
+        return values / seasonal
+
+    def pct_change(self, periods: int = 1):
+        """
+        Percentage change of the seasonally adjusted series; see `IndexMatrix.pct_change`.
+        """
+        return self.adjusted().pct_change(periods)
+
+    def append(self, month: str, values):
+        """
+        Adds one new month of values and updates the seasonal factors incrementally.
+
+        Only the month that now has a full centred window is detrended and added
+        to the per-month sums, so an append costs O(series) however long the history.
+
+        Args:
+            month (str): The month in format "YYYYMmm"; must follow the last month.
+            values (array-like): Values in the order of `matrix.codes`.
+
+        Returns:
+            np.ndarray: The seasonally adjusted values for the new month.
+        """
+        ordinal = month_ordinal(month)
+        if self._last_ordinal is not None and ordinal != self._last_ordinal + 1:
+            raise ValueError(f"Expected {month_label(self._last_ordinal + 1)}, got {month}")
+        row = np.asarray(values, dtype=float).reshape(len(self._matrix.codes))
+        self._pending_months.append(month)
+        self._pending_values.append(row[None, :])
+        self._window.append(row)
+        self._last_ordinal = ordinal
+        self._adjusted = None
+
+        if len(self._window) == len(TREND_WEIGHTS):
+            window = np.array(self._window)
+            trend = TREND_WEIGHTS @ window
+            centred = np.array([(ordinal - HALF_WINDOW) % 12])
+            self._accumulate(centred, self._detrend(window[HALF_WINDOW], trend)[None, :])
+        return self._adjust(row, np.array(ordinal))
@@ -0,0 +1,194 @@
+# Hagstofan/sqlite_store.py
+import sqlite3
+import threading
+
+import numpy as np
+
+from Hagstofan.matrix import IndexMatrix, month_label
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    source TEXT NOT NULL,
+    series TEXT NOT NULL,
+    period TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (source, series, period)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS observations_period ON observations (source, period, series);
+CREATE TABLE IF NOT EXISTS labels (
+    source TEXT NOT NULL,
+    series TEXT NOT NULL,
+    label TEXT,
+    PRIMARY KEY (source, series)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    endpoint TEXT,
+    version INTEGER,
+    saved TEXT
+);
+"""
+
+# Only rows whose value changed are rewritten on a refresh
+UPSERT_OBSERVATION = """
+INSERT INTO observations (source, series, period, value) VALUES (?, ?, ?, ?)
+ON CONFLICT (source, series, period) DO UPDATE SET value = excluded.value
+WHERE value IS NOT excluded.value
+"""
+
+UPSERT_LABEL = """
+INSERT INTO labels (source, series, label) VALUES (?, ?, ?)
+ON CONFLICT (source, series) DO UPDATE SET label = excluded.label
+WHERE label IS NOT excluded.label
+"""
+
+# Month ordinal of a "YYYYMmm" period, computed in the database
+MONTH_ORDINAL_SQL = "CAST(substr(period, 1, 4) AS INTEGER) * 12 + CAST(substr(period, 6, 2) AS INTEGER) - 1"
+MONTH_GLOB = "[0-9][0-9][0-9][0-9]M[0-9][0-9]"
+
+
+class SQLiteStore:
+    """
+    Optional local SQLite copy of loaded data sources, for ad-hoc SQL.
+
+    Every source is stored in one long `observations` table, one row per
+    (source, series, period), with an index on (source, period, series) for
+    cross-sectional queries; series labels go to `labels`, and `sources` records
+    the data version saved. Saving again upserts: only new or changed values are
+    written. CPI weights are stored as their own source, "<name>_weights".
+
+    The store can be shared between threads (e.g. saving from a FreshnessWatcher
+    callback): it uses one connection and serializes access with a lock.
+
+    Example:
+        store = SQLiteStore("hagstofan.db")
+        store.save_all({"cpi": cpi, "ppi": ppi, "bci": construction_index})
+        store.query("SELECT period, value FROM observations WHERE source = 'cpi' AND series = ?", ["IS00"])
+    """
+
+    def __init__(self, path: str = "hagstofan.db"):
+        """
+        Args:
+            path (str): Database file, or ":memory:" for a temporary database.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self.connection.executescript(SCHEMA)
+
+    def save(self, name: str, source):
+        """
+        Writes (or refreshes) one loaded data source.
+
+        Args:
+            name (str): Source name used in the tables, e.g. "cpi".
+            source: A loaded data source with `index` and `get_label()`.
+
+        Returns:
+            int: Number of observations inserted or changed.
+        """
+        snapshot = source.snapshot() if hasattr(source, "snapshot") else source
+        tables = {name: snapshot.index}
+        if getattr(snapshot, "weights", None):
+            tables[f"{name}_weights"] = snapshot.weights
+
+        changed = 0
+        with self._lock, self.connection:
+            for table, index in tables.items():
+                before = self.connection.total_changes
+                self.connection.executemany(UPSERT_OBSERVATION, (
+                    (table, code, period, value) for (period, code), value in index.items()
+                ))
+                changed += self.connection.total_changes - before
+                codes = sorted({code for (_, code) in index})
+                self.connection.executemany(UPSERT_LABEL, (
+                    (table, code, snapshot.get_label(code)) for code in codes
+                ))
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO sources (source, endpoint, version, saved) "
+                    "VALUES (?, ?, ?, datetime('now'))",
+                    (table, getattr(snapshot, "endpoint", None), getattr(snapshot, "version", None)),
+                )
+        return changed
+
+    def save_all(self, sources):
+        """
+        Writes several data sources in one go.
+
+        Args:
+            sources (dict): Mapping from source name to a loaded data source.
+
+        Returns:
+            dict: {name: observations inserted or changed}
+        """
+        return {name: self.save(name, source) for name, source in sources.items()}
+
+    def query(self, sql: str, params=()):
+        """
+        Runs a SQL query and returns the result column by column.
+
+        Returns:
+            dict: {column name: np.ndarray}. Numeric columns are float or int arrays,
+                text columns string arrays.
+        """
+        with self._lock:
+            cursor = self.connection.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+        if not rows:
+            return {name: np.array([]) for name in names}
+        columns = zip(*rows)
+        return {name: np.array(column) for name, column in zip(names, columns)}
+
+    def matrix(self, source: str, codes=None, start: str = None, end: str = None):
+        """
+        Reads the monthly series of a source back as an IndexMatrix.
+
+        Args:
+            source (str): Source name, e.g. "cpi".
+            codes (list, optional): Series to read. Defaults to all of them, sorted.
+            start (str, optional): First month "YYYYMmm".
+            end (str, optional): Last month "YYYYMmm".
+
+        Returns:
+            IndexMatrix
+        """
+        sql = f"SELECT series, {MONTH_ORDINAL_SQL} AS ordinal, value FROM observations " \
+              f"WHERE source = ? AND period GLOB '{MONTH_GLOB}'"
+        params = [source]
+        if codes is not None:
+            sql += f" AND series IN ({', '.join('?' * len(codes))})"
+            params += list(codes)
+        if start is not None:
+            sql += " AND period >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND period <= ?"
+            params.append(end)
+        result = self.query(sql, params)
+
+        found, inverse = np.unique(result["series"], return_inverse=True)
+        codes = found.tolist() if codes is None else list(codes)
+        if not len(found) or not codes:
+            return IndexMatrix([], codes, np.empty((0, len(codes))))
+
+        positions = {code: i for i, code in enumerate(codes)}
+        columns = np.array([positions[c] for c in found.tolist()])
+        ordinals = result["ordinal"].astype(np.int64)
+        first, last = ordinals.min(), ordinals.max()
+        values = np.full((last - first + 1, len(codes)), np.nan)
+        values[ordinals - first, columns[inverse]] = result["value"].astype(float)
+        return IndexMatrix([month_label(o) for o in range(first, last + 1)], codes, values)
+
+    def labels(self, source: str):
+        """
+        Returns {series: label} for a source.
+        """
+        with self._lock:
+            rows = self.connection.execute("SELECT series, label FROM labels WHERE source = ?", (source,))
+            return dict(rows.fetchall())
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
@@ -1,11 +1,12 @@
 from Hagstofan.api_client import APIClient
+from Hagstofan.registry import shared
 from Hagstofan.economy.construction_price_index import ConstructionPriceIndex
 from statistics import mean, median
 import matplotlib.pyplot as plt
 
 # Setup
 client = APIClient(base_url='https://px.hagstofa.is:443/pxis/api/v1')
-cindex = ConstructionPriceIndex(client)
+cindex = shared(ConstructionPriceIndex, client)
 
 print("\nSögulegar tölur eftir undirvísitölum byggingarvísitölu:")
 
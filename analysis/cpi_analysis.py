@@ -1,24 +1,29 @@
 
 from Hagstofan.api_client import APIClient
+from Hagstofan.registry import shared
 from Hagstofan.economy.cpi import CPI
+from Hagstofan.plotting import SeriesPlotter
 from statistics import mean, median
 from datetime import datetime
 import matplotlib.pyplot as plt
 from dateutil.relativedelta import relativedelta
 import pandas as pd
+import numpy as np
 from statistics import mean
 
-# Reikna breytingar sögulega
+# Reikna breytingar sögulega (only between consecutive calendar months, never across a gap)
 def historical_changes_for_isnr(isnr):
-    dates = sorted({d for (d, i) in cpi.index if i == isnr})
-    values = [cpi.get_value_for(d, isnr) for d in dates if isinstance(cpi.get_value_for(d, isnr), float)]
-    if len(values) > 1:
-        return [((values[i] - values[i - 1]) / values[i - 1]) * 100 for i in range(1, len(values))]
-    return []
+    position = matrix.position(isnr)
+    if position is None:
+        return []
+    changes = monthly_changes[:, position]
+    return changes[~np.isnan(changes)].tolist()
 
 # Setup
 client = APIClient(base_url='https://px.hagstofa.is:443/pxis/api/v1')
-cpi = CPI(client)
+cpi = shared(CPI, client)
+matrix = cpi.to_matrix()
+monthly_changes = matrix.pct_change(1)
 
 # Get all historical CPI values for IS00
 cpi_code = "IS00"
@@ -27,10 +32,7 @@ historical_labels = [d for d, _ in all_data]
 historical_values = [v for _, v in all_data]
 
 # Calculate historical monthly changes
-historical_changes = [
-    ((historical_values[i] - historical_values[i - 1]) / historical_values[i - 1]) * 100
-    for i in range(1, len(historical_values))
-]
+historical_changes = historical_changes_for_isnr(cpi_code)
 print("\nSöguleg tölfræði vísitölu neysluverðs:")
 print(f" - Average monthly CPI increase: {mean(historical_changes):.2f}%")
 print(f" - Median monthly CPI increase: {median(historical_changes):.2f}%")
@@ -39,13 +41,8 @@ print(f" - Median monthly CPI increase: {median(historical_changes):.2f}%")
 print("\nSögulegt meðaltal og miðgildi hverrar undirvísitölu:")
 historical_isnr_changes = {}
 for isnr in cpi.list_is_nr_values():
-    dates = sorted({d for (d, i) in cpi.index if i == isnr})
-    values = [cpi.get_value_for(d, isnr) for d in dates if isinstance(cpi.get_value_for(d, isnr), float)]
-    if len(values) > 1:
-        changes = [
-            ((values[i] - values[i - 1]) / values[i - 1]) * 100
-            for i in range(1, len(values))
-        ]
+    changes = historical_changes_for_isnr(isnr)
+    if changes:
         historical_isnr_changes[isnr] = mean(changes)
         print(f"{isnr} ({cpi.get_label_for_is_nr(isnr)}): avg = {mean(changes):.2f}%, median = {median(changes):.2f}%")
 
@@ -54,14 +51,12 @@ projected_values = historical_values.copy()
 projected_labels = historical_labels.copy()
 projected = []
 projected_changes = []
+recent_changes = list(historical_changes)
 base_date = datetime.strptime(historical_labels[-1], "%YM%m")
 
 for i in range(6):
-    recent_changes = [
-        ((projected_values[j] - projected_values[j - 1]) / projected_values[j - 1]) * 100
-        for j in range(len(projected_values) - 12, len(projected_values))
-    ]
-    next_change = mean(recent_changes)
+    next_change = mean(recent_changes[-12:])
+    recent_changes.append(next_change)
     next_value = projected_values[-1] * (1 + next_change / 100)
     projected_values.append(next_value)
     projected_changes.append(round(next_change, 2))
@@ -81,12 +76,13 @@ historical_projection = historical_projection[1:]
 
 # Top ISNR áhrif
 increases = cpi.get_increase_over_months(12)
-latest_date = max([d for (d, _) in cpi.weights])
-weights = {
-    isnr: cpi.get_weight(latest_date, isnr)
-    for isnr in cpi.list_is_nr_values()
-    if cpi.get_weight(latest_date, isnr) is not None
-}
+latest_date = historical_labels[-1]
+latest_weights = cpi.weights_asof([latest_date])
+weights = {}
+for isnr in cpi.list_is_nr_values():
+    position = latest_weights.position(isnr)
+    if position is not None and not np.isnan(latest_weights.values[0, position]):
+        weights[isnr] = float(latest_weights.values[0, position])
 impact_scores = {
     isnr: (increases.get(isnr, 0) * weights.get(isnr, 0)) / 100
     for isnr in weights
@@ -144,18 +140,11 @@ plt.show()
 isnr_code = "IS0451"
 label = cpi.get_label_for_is_nr(isnr_code)
 
-# Ná í dagsetningar og gildi
-dates = sorted({d for (d, i) in cpi.index if i == isnr_code})
-values = [cpi.get_value_for(d, isnr_code) for d in dates if isinstance(cpi.get_value_for(d, isnr_code), float)]
-
-# Breyta YYYYMM strengi í datetime fyrir betri merkingu á x-ás
-from datetime import datetime
-parsed_dates = [datetime.strptime(d, "%YM%m") for d in dates[:len(values)]]
-
-# Teikna línurit
+# Teikna línurit, grisjað niður í breidd myndarinnar
 plt.figure(figsize=(10, 5))
-plt.plot(parsed_dates, values, label=label, color='red')
-plt.plot(parsed_dates, historical_values, label=cpi.get_label_for_is_nr("IS00"), color='green', linestyle='--', alpha=0.5)
+plotter = SeriesPlotter(cpi)
+plotter.plot([isnr_code], color='red')
+plotter.plot(["IS00"], color='green', linestyle='--', alpha=0.5)
 plt.title(f"Söguleg þróun: {label} ({isnr_code})")
 plt.xlabel("Tími")
 plt.ylabel("Vísitölugildi")
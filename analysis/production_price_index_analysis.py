@@ -1,17 +1,22 @@
 from Hagstofan.api_client import APIClient
+from Hagstofan.registry import shared
 from Hagstofan.economy.production_price_index import ProductionPriceIndex
+from Hagstofan.plotting import SeriesPlotter
 from statistics import mean, median
+import numpy as np
 import matplotlib.pyplot as plt
 
 # Setup
 client = APIClient(base_url='https://px.hagstofa.is:443/pxis/api/v1')
-cindex = ProductionPriceIndex(client)
+cindex = shared(ProductionPriceIndex, client)
 
 print("\nSögulegar tölur eftir undirvísitölum framleiðsluvísitölu:")
 
-# Prepare plot
-plt.figure(figsize=(12, 6))
-plotted_categories = 0
+plotted_categories = []
+
+# Monthly % changes on the calendar month axis: NaN wherever either month is missing
+matrix = cindex.to_matrix()
+monthly_changes = matrix.pct_change(1)
 
 for category in cindex.list_categories():
     label = cindex.get_label_for_category(category)
@@ -20,30 +25,31 @@ for category in cindex.list_categories():
     if len(historical) < 2:
         continue
 
-    # Split into months and values
-    months, values = zip(*historical)
+    months = [month for month, _ in historical]
 
-    # Calculate monthly % changes
-    changes = [
-        ((values[i] - values[i - 1]) / values[i - 1]) * 100
-        for i in range(1, len(values))
-    ]
+    # Changes within the window, skipping those across a missing month
+    rows = slice(matrix.months.index(months[0]) + 1, matrix.months.index(months[-1]) + 1)
+    changes = monthly_changes[rows, matrix.position(category)]
+    changes = changes[~np.isnan(changes)].tolist()
+    if not changes:
+        continue
 
     print(f"{label}: meðaltal = {mean(changes):.2f}%, miðgildi = {median(changes):.2f}%")
 
-    # Plot line for this category
-    plt.plot(months, values, label=label)
-    plotted_categories += 1
+    plotted_categories.append(category)
+    start = months[0]
 
-# Finalize plot
+# Plot the same 60 months for every category, downsampled to the width of the figure
+plt.figure(figsize=(12, 6))
+if plotted_categories:
+    SeriesPlotter(cindex).plot(plotted_categories, start=start)
 plt.title("Söguleg þróun vísitölu framleiðsluverðs (síðustu 60 mánuðir)")
-plt.xlabel("Tímabil (YYYYMmm)")
+plt.xlabel("Ár")
 plt.ylabel("Vísitala")
-plt.xticks(ticks=range(0, len(months), 12), labels=months[::12], rotation=45)
 plt.grid(True, axis='y')
 plt.legend(loc="center left", bbox_to_anchor=(1, 0.5))
 plt.tight_layout()
 plt.show()
 
-if plotted_categories == 0:
+if not plotted_categories:
     print("Engin gögn fundust til að birta línurit.")
@@ -9,6 +9,7 @@ setup(
     install_requires=[
         'requests',
         'python-dateutil',
+        'numpy',
     ],
     classifiers=[
         'Programming Language :: Python :: 3',
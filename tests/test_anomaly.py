@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.anomaly import AnomalyDetector
+from Hagstofan.matrix import IndexMatrix, month_label, month_ordinal
+
+def monthly_matrix(changes, codes):
+    months = [month_label(month_ordinal("2015M01") + i) for i in range(len(changes))]
+    return IndexMatrix(months, codes, 100 * np.cumprod(1 + changes / 100, axis=0))
+
+class TestAnomalyDetector(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        changes = 0.3 + rng.normal(0, 0.1, size=(72, 2))
+        changes[48, 0] += 5.0            # spike in A
+        changes[48:, 1] += 1.0           # lasting step in B's monthly change
+        self.matrix = monthly_matrix(changes, ["A", "B"])
+
+    def test_spike_is_an_outlier(self):
+        results = AnomalyDetector(["A", "B"]).update_from(self.matrix)
+        flagged = [r["month"] for r in results if "A" in r["outliers"]]
+        self.assertIn(self.matrix.months[48], flagged)
+        self.assertEqual(flagged.count(self.matrix.months[48]), 1)
+
+    def test_step_is_a_shift(self):
+        results = AnomalyDetector(["A", "B"]).update_from(self.matrix)
+        shifted = [i for i, r in enumerate(results) if "B" in r["shifts"]]
+        self.assertTrue(shifted)
+        self.assertTrue(48 <= shifted[0] <= 52)
+        self.assertFalse([i for i in shifted if i < 48])
+
+    def test_z_scores_are_standardized(self):
+        rng = np.random.default_rng(2)
+        matrix = monthly_matrix(0.3 + rng.normal(0, 0.1, size=(2000, 3)), ["A", "B", "C"])
+        z = np.array([r["z"] for r in AnomalyDetector(matrix.codes, alpha=0.02).update_from(matrix)])
+        self.assertTrue(0.95 < np.nanstd(z) < 1.15)
+
+    def test_no_change_across_missing_month(self):
+        values = self.matrix.values.copy()
+        values[30, 0] = np.nan
+        detector = AnomalyDetector(["A", "B"])
+        results = detector.update_from(IndexMatrix(self.matrix.months, ["A", "B"], values))
+        self.assertTrue(np.isnan(results[30]["z"][0]))
+        self.assertTrue(np.isnan(results[31]["z"][0]))
+        self.assertFalse(np.isnan(results[32]["z"][0]))
+        self.assertEqual(detector.count.tolist(), [69, 71])
+
+    def test_save_and_resume(self):
+        head = IndexMatrix(self.matrix.months[:40], ["A", "B"], self.matrix.values[:40])
+        detector = AnomalyDetector.from_matrix(head)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "detector.npz")
+            detector.save(path, head)
+            restored, saved = AnomalyDetector.load(path)
+        self.assertEqual(saved.months, head.months)
+        self.assertEqual(restored.last_month, head.months[-1])
+
+        resumed = restored.update_from(self.matrix)
+        full = AnomalyDetector(["A", "B"]).update_from(self.matrix)[40:]
+        self.assertEqual([r["month"] for r in resumed], [r["month"] for r in full])
+        for a, b in zip(resumed, full):
+            np.testing.assert_array_equal(a["z"], b["z"])
+            self.assertEqual((a["outliers"], a["shifts"]), (b["outliers"], b["shifts"]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+import itertools
+import threading
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.base_data_source import BaseDataSource
+
+class FakePXClient:
+    """
+    Serves a (month x code) table with a small cell limit, answering item queries.
+    """
+    base_url = "fake"
+
+    def __init__(self, months, codes, limit=4, overlap=False):
+        self.months = list(months)
+        self.codes = list(codes)
+        self.limit = limit
+        self.overlap = overlap
+        self.queries = []
+        self.metadata_error = None
+        self._lock = threading.Lock()
+
+    def get_config(self):
+        return {"maxValues": self.limit}
+
+    def get(self, path):
+        if self.metadata_error is not None:
+            raise self.metadata_error
+        return {"title": "Fake", "variables": [
+            {"code": "Mánuður", "values": list(self.months), "time": True},
+            {"code": "Liður", "values": list(self.codes)},
+        ]}
+
+    def post(self, endpoint, body):
+        with self._lock:
+            self.queries.append(body)
+        selected = {item["code"]: item["selection"]["values"] for item in body.get("query", [])}
+        months = selected.get("Mánuður", self.months)
+        codes = selected.get("Liður", self.codes)
+        if self.overlap:
+            # Every chunk also repeats the first cell of the table
+            months, codes = [self.months[0]] + list(months), [self.codes[0]] + list(codes)
+        return {"data": [{"key": [m, c], "values": [f"{self.months.index(m)}{self.codes.index(c)}"]}
+                         for m, c in itertools.product(months, codes)]}
+
+class TableSource(BaseDataSource):
+    def __init__(self, client):
+        super().__init__(client, "fake/table.px")
+        self.load()
+
+    def load(self):
+        self._metadata = None
+        raw_data = self.get_data({"query": [], "response": {"format": "json"}})
+        snapshot = self._new_snapshot()
+        snapshot.index = {tuple(e["key"]): self.parse_value(e) for e in raw_data["data"]}
+        snapshot.missing = {}
+        snapshot.duplicates = []
+        self._publish(snapshot)
+
+class TestQuerySplitting(unittest.TestCase):
+    def test_split_sizes(self):
+        selections = {"Mánuður": ["2024M01", "2024M02", "2024M03", "2024M04", "2024M05", "2024M06"],
+                      "Liður": ["A", "B"]}
+        pieces = BaseDataSource._split_selections(selections, 4)
+        self.assertEqual([len(p["Mánuður"]) for p in pieces], [2, 2, 2])
+        self.assertTrue(all(p["Liður"] == ["A", "B"] for p in pieces))
+        self.assertEqual(BaseDataSource._split_selections(selections, 12), [selections])
+
+    def test_expand_and_item_rewrite(self):
+        variable = {"code": "Mánuður", "values": ["2023M12", "2024M01", "2024M02"], "time": True}
+        self.assertEqual(BaseDataSource._expand_selection(variable, {"filter": "top", "values": ["2"]}),
+                         ["2024M01", "2024M02"])
+        self.assertEqual(BaseDataSource._expand_selection(variable, {"filter": "all", "values": ["2024*"]}),
+                         ["2024M01", "2024M02"])
+        self.assertIsNone(BaseDataSource._expand_selection(variable, {"filter": "agg:x", "values": []}))
+
+        body = {"query": [{"code": "Mánuður", "selection": {"filter": "top", "values": ["2"]}}],
+                "response": {"format": "json"}}
+        rewritten = BaseDataSource._query_for(body, {"Mánuður": ["2024M01"], "Liður": None})
+        self.assertEqual(rewritten["query"], [{"code": "Mánuður", "selection": {"filter": "item", "values": ["2024M01"]}}])
+        self.assertEqual(rewritten["response"], body["response"])
+        self.assertEqual(body["query"][0]["selection"]["filter"], "top")
+
+    def test_chunks_are_merged_without_duplicates(self):
+        client = FakePXClient(["2024M01", "2024M02", "2024M03"], ["A", "B", "C"], limit=4, overlap=True)
+        source = BaseDataSource(client, "fake/table.px")
+        data = source.get_data({"query": [], "response": {"format": "json"}})
+        self.assertGreater(len(client.queries), 1)
+        keys = [tuple(e["key"]) for e in data["data"]]
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(set(keys), set(itertools.product(client.months, client.codes)))
+
+    def test_metadata_errors(self):
+        client = FakePXClient(["2024M01", "2024M02", "2024M03"], ["A", "B", "C"], limit=4)
+        client.metadata_error = requests.ConnectionError("metadata unavailable")
+        data = BaseDataSource(client, "fake/table.px").get_data({"query": [], "response": {"format": "json"}})
+        self.assertEqual(len(client.queries), 1)
+        self.assertEqual(len(data["data"]), 9)
+
+        client.metadata_error = RuntimeError("bug")
+        with self.assertRaises(RuntimeError):
+            BaseDataSource(client, "fake/table.px").get_data({"query": [], "response": {"format": "json"}})
+
+    def test_reload_requests_new_months(self):
+        client = FakePXClient([f"2024M0{m}" for m in range(1, 7)], ["A", "B"], limit=4)
+        source = TableSource(client)
+        self.assertEqual(len(source.index), 12)
+        client.months.append("2024M07")
+        source.load()
+        self.assertEqual(len(source.index), 14)
+        self.assertIn(("2024M07", "A"), source.index)
+
+if __name__ == '__main__':
+    unittest.main()
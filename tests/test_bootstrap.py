@@ -0,0 +1,41 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.matrix import IndexMatrix
+from Hagstofan.bootstrap import bootstrap_bands
+
+class TestBootstrap(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        index = {}
+        for code in ["IS00", "IS01", "IS0451"]:
+            value = 100.0
+            for year in range(2015, 2025):
+                for month in range(1, 13):
+                    value *= 1 + rng.normal(0.3, 0.5) / 100
+                    index[(f"{year}M{month:02d}", code)] = value
+        cls.matrix = IndexMatrix.from_index(index)
+
+    def test_bands_shape(self):
+        result = bootstrap_bands(self.matrix, horizon=6, n_resamples=200, seed=1, processes=1)
+        self.assertEqual(result["bands"].shape, (3, 6, 3))
+        self.assertEqual(result["months"][0], "2025M01")
+        self.assertTrue(np.all(np.diff(result["bands"], axis=0) >= 0))
+
+    def test_reproducible_across_process_counts(self):
+        single = bootstrap_bands(self.matrix, n_resamples=200, seed=7, processes=1)
+        pooled = bootstrap_bands(self.matrix, n_resamples=200, seed=7, processes=2)
+        np.testing.assert_array_equal(single["bands"], pooled["bands"])
+
+    def test_unknown_code(self):
+        with self.assertRaises(KeyError):
+            bootstrap_bands(self.matrix, codes=["XX"], processes=1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.economy.core_inflation import CoreInflation
+from Hagstofan.matrix import IndexMatrix
+
+CODES = ["IS00", "IS01", "IS02", "IS03", "IS04"]
+WEIGHTS = [100.0, 10.0, 20.0, 30.0, 40.0]
+
+class FakeCPI:
+    """
+    A loaded CPI stand-in whose second month can be replaced by `load()`.
+    """
+
+    def __init__(self, second_month):
+        self.version = 0
+        self.load(second_month)
+
+    def load(self, second_month):
+        values = np.array([[100.0] * len(CODES), second_month])
+        self.matrix = IndexMatrix(["2024M01", "2024M02"], CODES, values)
+        self.version += 1
+
+    def snapshot(self):
+        return self
+
+    def to_matrix(self):
+        return self.matrix
+
+    def weights_asof(self, months=None):
+        months = self.matrix.months if months is None else months
+        return IndexMatrix(months, CODES, np.array([WEIGHTS] * len(months)))
+
+class TestCoreInflation(unittest.TestCase):
+    def setUp(self):
+        # Monthly changes: IS01 +1%, IS02 +2%, IS03 -1%, IS04 +4%, weight shares 0.1-0.4
+        self.cpi = FakeCPI([101.0, 101.0, 102.0, 99.0, 104.0])
+        self.core = CoreInflation(self.cpi, periods=1)
+
+    def test_weighted_median(self):
+        median = self.core.weighted_median().column("weighted_median")
+        self.assertTrue(np.isnan(median[0]))
+        # Sorted: IS03 (cumulative 0.3), IS01 (0.4), IS02 (0.6), IS04 (1.0)
+        self.assertAlmostEqual(median[1], 2.0)
+
+    def test_trimmed_mean_keeps_partial_weights(self):
+        trimmed = self.core.trimmed_mean(0.1, 0.1).column("trimmed_mean")
+        # Kept shares: IS03 0.2, IS01 0.1, IS02 0.2, IS04 0.3
+        self.assertAlmostEqual(trimmed[1], (0.2 * -1 + 0.1 * 1 + 0.2 * 2 + 0.3 * 4) / 0.8)
+        untrimmed = self.core.trimmed_mean(0, 0).column("trimmed_mean")
+        self.assertAlmostEqual(untrimmed[1], 0.1 * 1 + 0.2 * 2 + 0.3 * -1 + 0.4 * 4)
+
+    def test_diffusion(self):
+        self.assertAlmostEqual(self.core.diffusion().column("diffusion")[1], 75.0)
+        self.assertAlmostEqual(self.core.diffusion(weighted=True).column("diffusion")[1], 70.0)
+        self.assertEqual(self.core.leaves, ["IS01", "IS02", "IS03", "IS04"])
+
+    def test_reload_invalidates_cache(self):
+        first = self.core.weighted_median()
+        self.assertIs(self.core.weighted_median(), first)
+        self.cpi.load([101.0, 105.0, 105.0, 105.0, 105.0])
+        second = self.core.weighted_median()
+        self.assertIsNot(second, first)
+        self.assertAlmostEqual(second.column("weighted_median")[1], 5.0)
+        self.assertEqual(self.core._version, 2)
+
+if __name__ == '__main__':
+    unittest.main()
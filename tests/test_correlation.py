@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.correlation import LeadLag
+from Hagstofan.matrix import IndexMatrix, month_label, month_ordinal
+
+def monthly_matrix(values, codes):
+    months = [month_label(month_ordinal("2010M01") + i) for i in range(len(values))]
+    return IndexMatrix(months, codes, values)
+
+def brute_force(changes, leader, target, lag, min_overlap):
+    a, b = changes[:, leader], changes[:, target]
+    if lag >= 0:
+        a, b = a[:len(a) - lag], b[lag:]
+    else:
+        a, b = a[-lag:], b[:len(b) + lag]
+    both = ~np.isnan(a) & ~np.isnan(b)
+    if both.sum() < min_overlap:
+        return np.nan
+    return np.corrcoef(a[both], b[both])[0, 1]
+
+class TestLeadLag(unittest.TestCase):
+    def test_matches_masked_pearson(self):
+        rng = np.random.default_rng(7)
+        levels = 100 * np.cumprod(1 + rng.normal(0, 0.01, size=(60, 3)), axis=0)
+        levels[[5, 6, 30], 0] = np.nan
+        levels[40:44, 2] = np.nan
+        matrix = monthly_matrix(levels, ["A", "B", "C"])
+        lead_lag = LeadLag(matrix, max_lag=4, min_overlap=10)
+        cube = lead_lag.matrix(chunk_size=2)
+
+        changes = matrix.pct_change(1)[1:]
+        for i, lag in enumerate(lead_lag.lags):
+            for leader in range(3):
+                for target in range(3):
+                    expected = brute_force(changes, leader, target, lag, 10)
+                    np.testing.assert_allclose(cube[i, leader, target], expected, atol=1e-10)
+        np.testing.assert_allclose(lead_lag.column("B"), cube[:, :, 1])
+
+    def test_leaders_finds_planted_lag(self):
+        rng = np.random.default_rng(3)
+        changes = rng.normal(0, 0.01, size=(120, 3))
+        changes[3:, 1] = changes[:-3, 0] + rng.normal(0, 0.001, size=117)
+        levels = 100 * np.cumprod(1 + changes, axis=0)
+        lead_lag = LeadLag(monthly_matrix(levels, ["A", "B", "C"]), max_lag=6)
+
+        best = lead_lag.leaders("B", k=2)
+        self.assertEqual(best[0]["code"], "A")
+        self.assertEqual(best[0]["lag"], 3)
+        self.assertGreater(best[0]["corr"], 0.9)
+        self.assertNotIn("B", [row["code"] for row in best])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -84,6 +84,19 @@ class TestCPI(unittest.TestCase):
         result = self.cpi.get_weight("1990M01", "XX")
         self.assertIsInstance(result, None.__class__)
 
+    def test_weight_asof_matches_weights_asof(self):
+        month = self.cpi.to_matrix().months[-1]
+        latest = self.cpi.weights_asof([month])
+        for is_nr in latest.codes[:20]:
+            expected = latest.values[0, latest.position(is_nr)]
+            value = self.cpi.get_weight_asof(month, is_nr)
+            if expected != expected:
+                self.assertIsNone(value)
+            else:
+                self.assertEqual(value, expected)
+        self.assertIsNone(self.cpi.get_weight_asof("1900M01", latest.codes[0]))
+        self.assertIs(self.cpi.filled_weight_matrix(), self.cpi.filled_weight_matrix())
+
     def test_increase_over_months_returns_valid_structure(self):
         result = self.cpi.get_increase_over_months(12)
         self.assertIsInstance(result, dict)
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.crawler import CatalogCrawler
+
+class Interrupted(BaseException):
+    """
+    Stands in for the process being stopped (like KeyboardInterrupt).
+    """
+
+class TreeClient:
+    """
+    Serves a small PX navigation tree; stops after `fail_after` table downloads.
+    """
+    base_url = "fake"
+    TREE = {
+        "is/root": [{"id": "sub", "type": "l"}, {"id": "t1.px", "type": "t"}],
+        "is/root/sub": [{"id": "t2.px", "type": "t"}, {"id": "t3.px", "type": "t"}, {"id": "t4.px", "type": "t"}],
+    }
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.folders = []
+        self.downloads = []
+
+    def get(self, path):
+        if path in self.TREE:
+            self.folders.append(path)
+            return self.TREE[path]
+        return {"variables": []}
+
+    def post(self, endpoint, body):
+        if self.fail_after is not None and len(self.downloads) >= self.fail_after:
+            raise Interrupted()
+        self.downloads.append(endpoint)
+        return {"data": [{"key": ["2024M01"], "values": [endpoint]}]}
+
+class TestCatalogCrawler(unittest.TestCase):
+    def test_resumes_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = TreeClient(fail_after=2)
+            with self.assertRaises(Interrupted):
+                CatalogCrawler(first, "is/root", directory, workers=1).crawl()
+            with open(os.path.join(directory, CatalogCrawler.CHECKPOINT_NAME), encoding="utf-8") as f:
+                state = json.load(f)
+            self.assertEqual(len(state["tables"]), 4)
+            self.assertEqual(sorted(state["done"]), sorted(first.downloads))
+
+            second = TreeClient()
+            crawler = CatalogCrawler(second, "is/root", directory, workers=1)
+            result = crawler.crawl()
+            self.assertEqual(second.folders, [])
+            self.assertEqual(result, {"downloaded": 2, "skipped": 2, "failed": {}})
+            self.assertFalse(set(second.downloads) & set(first.downloads))
+
+            for table in state["tables"]:
+                with open(crawler.table_path(table), encoding="utf-8") as f:
+                    self.assertEqual(json.load(f)["data"][0]["values"], [table])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import sys
+import os
+import datetime
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.economy.deflation import Deflator, month_ordinals
+from Hagstofan.matrix import IndexMatrix, month_label, month_ordinal
+
+class TestMonthOrdinals(unittest.TestCase):
+    def test_date_formats(self):
+        expected = month_ordinal("2024M03")
+        self.assertEqual(month_ordinals(["2024M03"]).tolist(), [expected])
+        self.assertEqual(month_ordinals(["2024-03-15", "2024-03-31T23:59"]).tolist(), [expected, expected])
+        self.assertEqual(month_ordinals(np.array(["2024-03-02"], dtype="datetime64[ns]")).tolist(), [expected])
+        self.assertEqual(month_ordinals([datetime.date(2024, 3, 1)]).tolist(), [expected])
+        self.assertEqual(month_ordinals(np.array(["NaT"], dtype="datetime64[D]")).tolist(), [-1])
+
+    def test_mixed_formats(self):
+        expected = [month_ordinal("2024M01"), month_ordinal("2024M03")]
+        self.assertEqual(month_ordinals(["2024-01-05", "2024M03"]).tolist(), expected)
+        mixed = np.array([datetime.date(2024, 1, 5), "2024M03", None], dtype=object)
+        self.assertEqual(month_ordinals(mixed).tolist(), expected + [-1])
+
+class TestDeflator(unittest.TestCase):
+    def setUp(self):
+        months = [month_label(month_ordinal("2020M01") + i) for i in range(24)]
+        values = np.column_stack([np.linspace(100, 123, 24), np.full(24, 50.0)])
+        values[5, 0] = np.nan
+        self.matrix = IndexMatrix(months, ["IS00", "IS01"], values)
+
+    def test_deflate(self):
+        deflator = Deflator(self.matrix, "IS00", base="2020M01", chunk_size=2)
+        real = deflator.deflate(["2020M01", "2021-12-15", "2020M06", "2019M12"], [100.0, 123.0, 10.0, 10.0])
+        self.assertEqual(real[:2].tolist(), [100.0, 100.0])
+        self.assertTrue(np.isnan(real[2:]).all())
+
+    def test_default_base_is_latest_month(self):
+        deflator = Deflator(self.matrix, "IS00")
+        self.assertEqual(deflator.base, "2021M12")
+        self.assertAlmostEqual(deflator.deflate(["2020M01"], [100.0])[0], 123.0)
+
+    def test_chunks(self):
+        deflator = Deflator(self.matrix, "IS01", base="2020")
+        dates = np.arange("2020-01", "2022-01", dtype="datetime64[M]")
+        results = list(deflator.deflate_chunks([(dates[:10], np.ones(10)), (dates[10:], np.ones(14))]))
+        self.assertEqual([len(r) for r in results], [10, 14])
+        self.assertTrue((np.concatenate(results) == 1.0).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.matrix import IndexMatrix
+from Hagstofan.panel import Panel
+from Hagstofan.expressions import series, weighted_sum, Evaluator
+
+class TestExpressions(unittest.TestCase):
+    def setUp(self):
+        months = [f"{2020 + i // 12}M{i % 12 + 1:02d}" for i in range(36)]
+        steps = np.arange(36, dtype=float)
+        cpi = IndexMatrix(months, ["IS00", "IS04"], np.column_stack([100 + steps, 50 + 2 * steps]))
+        bci = IndexMatrix(months, ["BCI"], (200 + 3 * steps)[:, None])
+        self.evaluator = Evaluator(Panel({"cpi": cpi, "bci": bci}))
+
+    def test_common_subexpressions_are_shared(self):
+        self.assertIs(series("cpi", "IS00") * 2, series("cpi", "IS00") * 2)
+        a = weighted_sum({series("cpi", "IS00"): 0.7, series("cpi", "IS04"): 0.3})
+        b = weighted_sum([(series("cpi", "IS04"), 0.3), (series("cpi", "IS00"), 0.7)])
+        self.assertIs(a, b)
+
+    def test_deep_graph_keys_stay_shallow(self):
+        node = series("cpi", "IS00")
+        for _ in range(200):
+            child, node = node, node + 1
+        self.assertIs(node.key[1], child)
+        self.assertIs(node, child + 1)
+        self.assertAlmostEqual(self.evaluator.evaluate(node)[0], 300.0)
+        self.assertIn(node, self.evaluator._memo)
+
+    def test_arithmetic_and_weighted_sum(self):
+        mixed = weighted_sum({series("cpi", "IS00"): 3, series("cpi", "IS04"): 1}, normalize=True)
+        values = self.evaluator.evaluate(mixed)
+        self.assertAlmostEqual(values[0], (3 * 100 + 50) / 4)
+
+    def test_rebase_shift_and_rolling(self):
+        result = self.evaluator.evaluate({
+            "real": series("bci", "BCI") / series("cpi", "IS00").rebase("2020M01") * 100,
+            "lag": series("cpi", "IS00").shift(2),
+            "roll": series("cpi", "IS00").rolling(3),
+            "yoy": series("cpi", "IS00").pct_change(12),
+        })
+        self.assertAlmostEqual(result.column("real")[0], 200.0)
+        self.assertTrue(np.isnan(result.column("lag")[1]))
+        self.assertEqual(result.column("lag")[2], 100.0)
+        self.assertEqual(result.column("roll")[2], 101.0)
+        self.assertAlmostEqual(result.column("yoy")[12], 12.0)
+
+    def test_shift_past_the_month_axis(self):
+        for months in (36, 40, -36, -40):
+            self.assertTrue(np.isnan(self.evaluator.evaluate(series("cpi", "IS00").shift(months))).all())
+        self.assertTrue(np.isnan(self.evaluator.evaluate(series("cpi", "IS00").pct_change(48))).all())
+
+    def test_unknown_series(self):
+        with self.assertRaises(KeyError):
+            self.evaluator.evaluate(series("cpi", "XX"))
+
+if __name__ == '__main__':
+    unittest.main()
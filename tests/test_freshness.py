@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.base_data_source import BaseDataSource
+from Hagstofan.freshness import FreshnessWatcher
+
+class ListingClient:
+    """
+    Serves a folder listing whose "updated" stamp the test can move.
+    """
+    base_url = "fake"
+
+    def __init__(self):
+        self.updated = "2024-06-27T09:00:00"
+        self.gets = []
+
+    def get(self, path):
+        self.gets.append(path)
+        return [{"id": "other.px", "type": "t", "updated": "2030-01-01T00:00:00"},
+                {"id": "table.px", "type": "t", "updated": self.updated}]
+
+class CountingSource(BaseDataSource):
+    def __init__(self, client):
+        super().__init__(client, "is/folder/table.px")
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+
+class TestFreshnessWatcher(unittest.TestCase):
+    def setUp(self):
+        self.client = ListingClient()
+        self.source = CountingSource(self.client)
+        self.calls = []
+        self.watcher = FreshnessWatcher(self.source, callback=lambda source, updated: self.calls.append(updated))
+
+    def test_last_updated_reads_folder_listing(self):
+        self.assertEqual(self.source.get_last_updated(), "2024-06-27T09:00:00")
+        self.assertEqual(self.client.gets[-1], "is/folder")
+
+    def test_reloads_only_when_stamp_moves(self):
+        self.assertFalse(self.watcher.check())
+        self.assertEqual((self.source.loads, self.calls), (0, []))
+
+        self.client.updated = "2024-07-26T09:00:00"
+        self.assertTrue(self.watcher.check())
+        self.assertEqual((self.source.loads, self.calls), (1, ["2024-07-26T09:00:00"]))
+
+        self.assertFalse(self.watcher.check())
+        self.assertEqual(self.source.loads, 1)
+
+    def test_without_reload(self):
+        watcher = FreshnessWatcher(self.source, reload=False, callback=lambda source, updated: self.calls.append(updated))
+        self.client.updated = "2024-07-26T09:00:00"
+        self.assertTrue(watcher.check())
+        self.assertEqual((self.source.loads, len(self.calls)), (0, 1))
+
+if __name__ == '__main__':
+    unittest.main()
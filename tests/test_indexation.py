@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.economy.indexation import LoanBook
+from Hagstofan.matrix import IndexMatrix, month_label, month_ordinal
+
+def monthly_index(values, first="2020M01"):
+    months = [month_label(month_ordinal(first) + i) for i in range(len(values))]
+    return IndexMatrix(months, ["IS00"], np.asarray(values, dtype=float)[:, None])
+
+class TestLoanBook(unittest.TestCase):
+    def setUp(self):
+        self.index = monthly_index(100 * 1.01 ** np.arange(36))
+        self.book = LoanBook(self.index, principal=[1200.0, 1000.0], annual_rate=[6.0, 0.0], term=[12, 10],
+                             start=["2020M01", "2020M06"], annuity=[True, False])
+
+    def test_matches_month_by_month_loop(self):
+        schedule = self.book.schedule()
+        rate, balance, previous_ratio = 0.005, 1200.0, 1.0
+        payment = balance * rate / (1 - (1 + rate) ** -12)
+        for k in range(1, 13):
+            ratio = 1.01 ** k
+            interest = balance * rate
+            self.assertAlmostEqual(schedule["indexation"][0, k - 1], balance * (ratio - previous_ratio))
+            self.assertAlmostEqual(schedule["interest"][0, k - 1], interest * ratio)
+            self.assertAlmostEqual(schedule["installment"][0, k - 1], payment * ratio)
+            balance -= payment - interest
+            previous_ratio = ratio
+            self.assertAlmostEqual(schedule["balance"][0, k - 1], balance * ratio)
+        self.assertAlmostEqual(schedule["balance"][0, 11], 0.0)
+        self.assertEqual(schedule["months"][1, 0], "2020M07")
+        self.assertEqual(schedule["months"][1, 10], "")
+
+    def test_equal_principal(self):
+        july = self.book.month("2020M07")
+        self.assertEqual(july["payment"].tolist(), [6, 1])
+        self.assertAlmostEqual(july["principal"][1], 100 * 1.01)
+        self.assertAlmostEqual(july["balance"][1], 900 * 1.01)
+        self.assertEqual(self.book.month("2019M12")["installment"].tolist(), [0.0, 0.0])
+
+    def test_update_only_recomputes_changed_months(self):
+        early, latest = self.book.month("2021M02"), self.book.month("2022M12")
+        values = list(100 * 1.01 ** np.arange(36)) + [200.0]
+        self.assertEqual(self.book.update(monthly_index(values)), ["2023M01"])
+        self.assertIs(self.book.month("2021M02"), early)
+        self.assertIs(self.book.month("2022M12"), latest)
+
+    def test_update_rebases_loans_started_past_the_index(self):
+        index = monthly_index(100 + np.arange(50), first="2020M01")
+        self.assertEqual(index.months[-1], "2024M02")
+        book = LoanBook(index, principal=[1000.0, 500.0], annual_rate=0.0, term=12, start=["2024M03", "2020M06"])
+        before = book.month("2024M04")
+        self.assertAlmostEqual(book.base_index[0], 149.0)
+
+        revised = monthly_index(list(100 + np.arange(50)) + [110.0], first="2020M01")
+        self.assertEqual(book.update(revised), ["2024M03"])
+        fresh = LoanBook(revised, principal=[1000.0, 500.0], annual_rate=0.0, term=12, start=["2024M03", "2020M06"])
+        self.assertEqual(book.base_index.tolist(), [110.0, 105.0])
+        for month in ("2024M04", "2024M05", "2020M12"):
+            for name, values in fresh.month(month).items():
+                np.testing.assert_allclose(book.month(month)[name], values)
+        self.assertAlmostEqual(book.month("2024M04")["balance"][0], 1000 * 11 / 12)
+        self.assertEqual(before["balance"][1], book.month("2024M04")["balance"][1])
+
+    def test_update_rebases_loans_whose_start_month_is_revised(self):
+        values = 100 + np.arange(50)
+        book = LoanBook(monthly_index(values), principal=[1000.0, 500.0], annual_rate=0.0, term=12,
+                        start=["2020M06", "2020M03"])
+        book.month("2020M12")
+        values = values.astype(float)
+        values[5] = 110.0
+        self.assertEqual(book.update(monthly_index(values)), ["2020M06"])
+        fresh = LoanBook(monthly_index(values), principal=[1000.0, 500.0], annual_rate=0.0, term=12,
+                         start=["2020M06", "2020M03"])
+        for name, expected in fresh.month("2020M12").items():
+            np.testing.assert_allclose(book.month("2020M12")[name], expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.economy.label_search import default_index, fold
+
+class TestLabelSearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = default_index()
+
+    def test_fold(self):
+        self.assertEqual(fold("Húsasmíði"), "husasmidi")
+        self.assertEqual(fold("Þjónusta"), "thjonusta")
+
+    def test_accent_insensitive_search(self):
+        hits = self.index.search("flugfargjold", k=2)
+        self.assertEqual({h["code"] for h in hits}, {"IS07331", "IS07332"})
+
+    def test_exact_code_ranks_first(self):
+        self.assertEqual(self.index.search("IS045")[0]["code"], "IS045")
+
+    def test_source_filter(self):
+        hits = self.index.search("husasmidi", source="bci")
+        self.assertTrue(hits)
+        self.assertTrue(all(h["source"] == "bci" for h in hits))
+
+    def test_tree_navigation(self):
+        self.assertEqual(self.index.parent("IS04511"), "IS0451")
+        self.assertEqual(self.index.children("IS045"), ["IS0451", "IS0455"])
+        self.assertEqual(self.index.ancestors("IS0451"), ["IS045", "IS04", "IS00"])
+        self.assertIsNone(self.index.parent("IS00"))
+
+if __name__ == '__main__':
+    unittest.main()
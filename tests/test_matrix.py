@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.matrix import IndexMatrix, PeriodMatrix, asof_join, chain_link
+
+class TestIndexMatrix(unittest.TestCase):
+    def setUp(self):
+        index = {(f"2015M{m:02d}", "IS00"): 100.0 + m for m in range(1, 13)}
+        index.update({(f"2016M{m:02d}", "IS00"): 120.0 + m for m in range(1, 13)})
+        index[("2016M06", "IS01")] = 50.0
+        self.matrix = IndexMatrix.from_index(index)
+
+    def test_month_axis_is_contiguous(self):
+        self.assertEqual(len(self.matrix), 24)
+        self.assertEqual(self.matrix.months[0], "2015M01")
+        self.assertEqual(self.matrix.months[-1], "2016M12")
+        self.assertTrue(np.isnan(self.matrix.column("IS01")[0]))
+
+    def test_rebase_to_month(self):
+        rebased = self.matrix.rebase("2016M01")
+        self.assertAlmostEqual(rebased.column("IS00")[12], 100.0)
+        self.assertIs(self.matrix.rebase("2016M01"), rebased)
+
+    def test_rebase_to_year_average(self):
+        rebased = self.matrix.rebase("2015")
+        self.assertAlmostEqual(np.mean(rebased.column("IS00")[:12]), 100.0)
+        np.testing.assert_allclose(rebased.values[:, 0], rebased.column("IS00"))
+
+    def test_rebase_outside_data(self):
+        with self.assertRaises(ValueError):
+            self.matrix.rebase("1990")
+
+    def test_rebase_empty_matrix(self):
+        with self.assertRaises(ValueError):
+            IndexMatrix.from_index({}).rebase("2015")
+
+    def test_pct_change_rejects_negative_periods(self):
+        self.assertAlmostEqual(self.matrix.pct_change(1)[1, 0], (102 / 101 - 1) * 100)
+        with self.assertRaises(ValueError):
+            self.matrix.pct_change(-1)
+
+    def test_resample_annual(self):
+        annual = self.matrix.to_annual()
+        self.assertEqual(annual.periods, ["2015", "2016"])
+        np.testing.assert_allclose(annual.column("IS00"), [106.5, 126.5])
+        self.assertTrue(np.isnan(annual.column("IS01")).all())
+        self.assertIs(self.matrix.to_annual(), annual)
+
+    def test_resample_quarterly_end_of_period(self):
+        quarterly = self.matrix.to_quarterly(how="last", incomplete="partial")
+        self.assertEqual(quarterly.periods[0], "2015Q1")
+        self.assertEqual(quarterly.column("IS00")[0], 103.0)
+        self.assertEqual(quarterly.column("IS01")[5], 50.0)
+
+    def test_annual_rate(self):
+        rate = self.matrix.annual_rate()
+        self.assertAlmostEqual(rate.column("IS00")[1], (126.5 / 106.5 - 1) * 100)
+
+    def test_asof_join(self):
+        weights = PeriodMatrix.from_index({("2015", "IS00"): 100.0, ("2016", "IS00"): 90.0, ("2015Q3", "IS01"): 5.0})
+        joined = asof_join(self.matrix, weights, codes=["IS00", "IS01", "XX"])
+        self.assertEqual(joined.months, self.matrix.months)
+        self.assertEqual(joined.column("IS00")[11], 100.0)
+        self.assertEqual(joined.column("IS00")[12], 90.0)
+        self.assertTrue(np.isnan(joined.column("IS01")[5]))
+        self.assertEqual(joined.column("IS01")[20], 5.0)
+        self.assertTrue(np.isnan(joined.column("XX")).all())
+
+    def test_forward_filled(self):
+        weights = PeriodMatrix.from_index({("2015", "IS00"): 100.0, ("2015Q3", "IS01"): 5.0, ("2016", "IS00"): 90.0})
+        filled = weights.forward_filled()
+        self.assertEqual(filled.periods, weights.periods)
+        np.testing.assert_array_equal(filled.column("IS00"), [100.0, 100.0, 90.0])
+        np.testing.assert_array_equal(filled.column("IS01")[1:], [5.0, 5.0])
+        self.assertTrue(np.isnan(filled.column("IS01")[0]))
+        self.assertTrue(np.isnan(weights.column("IS00")[1]))
+        np.testing.assert_array_equal(asof_join(self.matrix, filled, filled=True).values,
+                                      asof_join(self.matrix, weights).values)
+
+    def test_chain_link(self):
+        old = IndexMatrix.from_index({("2014M12", "IS00"): 50.0, ("2015M01", "IS00"): 55.0})
+        new = IndexMatrix.from_index({("2015M01", "IS00"): 100.0, ("2015M02", "IS00"): 110.0})
+        linked = chain_link(old, new)
+        self.assertEqual(linked.months, ["2014M12", "2015M01", "2015M02"])
+        np.testing.assert_allclose(linked.column("IS00"), [100 * 50 / 55, 100.0, 110.0])
+
+if __name__ == '__main__':
+    unittest.main()
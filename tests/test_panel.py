@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.matrix import IndexMatrix, month_label, month_ordinal
+from Hagstofan.panel import Panel
+
+def monthly_matrix(first, values, codes):
+    months = [month_label(month_ordinal(first) + i) for i in range(len(values))]
+    return IndexMatrix(months, codes, np.asarray(values, dtype=float))
+
+class TestPanel(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.cpi = monthly_matrix("2020M01", 100 + rng.normal(size=(24, 2)).cumsum(axis=0), ["IS00", "IS01"])
+        self.ppi = monthly_matrix("2021M01", 50 + rng.normal(size=(18, 2)).cumsum(axis=0), ["Food", "Metal"])
+        self.panel = Panel({"cpi": self.cpi, "ppi": self.ppi})
+
+    def test_alignment(self):
+        self.assertEqual(self.panel.months[0], "2020M01")
+        self.assertEqual(self.panel.months[-1], "2022M06")
+        self.assertEqual(self.panel.codes, ["cpi:IS00", "cpi:IS01", "ppi:Food", "ppi:Metal"])
+        food = self.panel.column("ppi:Food")
+        self.assertTrue(np.isnan(food[:12]).all())
+        np.testing.assert_array_equal(food[12:], self.ppi.column("Food"))
+        self.assertTrue(np.isnan(self.panel.column("cpi:IS00")[24:]).all())
+        self.assertEqual(self.panel.series[2], {"source": "ppi", "code": "Food", "label": "Food"})
+
+    def test_select_and_between_are_views(self):
+        ppi = self.panel.select("ppi")
+        self.assertEqual(ppi.codes, ["ppi:Food", "ppi:Metal"])
+        self.assertTrue(np.shares_memory(ppi.values, self.panel.values))
+        window = self.panel.between("2021M01", "2021M12")
+        self.assertEqual(len(window.months), 12)
+        self.assertTrue(np.shares_memory(window.values, self.panel.values))
+        scattered = self.panel.select(codes=["cpi:IS00", "ppi:Metal"])
+        self.assertEqual(scattered.codes, ["cpi:IS00", "ppi:Metal"])
+        self.assertFalse(np.shares_memory(scattered.values, self.panel.values))
+
+    def test_corr_uses_overlapping_months(self):
+        corr = self.panel.corr(changes=False)
+        overlap = slice(12, 24)
+        expected = np.corrcoef(self.panel.column("cpi:IS01")[overlap], self.panel.column("ppi:Food")[overlap])[0, 1]
+        self.assertAlmostEqual(corr[1, 2], expected)
+        self.assertAlmostEqual(corr[0, 0], 1.0)
+        self.assertAlmostEqual(corr[2, 1], corr[1, 2])
+
+    def test_regress_recovers_linear_relation(self):
+        x = np.arange(24, dtype=float)
+        matrix = monthly_matrix("2020M01", np.column_stack([2 + 3 * x, x]), ["Y", "X"])
+        result = Panel({"m": matrix}).regress("m:Y", ["m:X"], changes=False)
+        self.assertAlmostEqual(result["intercept"], 2.0)
+        self.assertAlmostEqual(result["coefficients"]["m:X"], 3.0)
+        self.assertAlmostEqual(result["r2"], 1.0)
+        self.assertEqual(result["n"], 24)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.matrix import IndexMatrix, month_label, month_ordinal
+from Hagstofan.plotting import SeriesPlotter, lttb
+
+class TestLTTB(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.values = np.cumsum(rng.normal(size=(300, 3)), axis=0)
+
+    def test_keeps_ends_and_extremes(self):
+        self.values[150, 1] = 1000.0
+        indices = lttb(self.values, 50)
+        self.assertEqual(indices.shape, (50, 3))
+        self.assertTrue((indices[0] == 0).all())
+        self.assertTrue((indices[-1] == 299).all())
+        self.assertTrue((np.diff(indices, axis=0) > 0).all())
+        self.assertIn(150, indices[:, 1])
+
+    def test_short_series_are_kept_whole(self):
+        indices = lttb(self.values[:20], 50)
+        self.assertEqual(indices[:, 0].tolist(), list(range(20)))
+
+    def test_skips_missing_values(self):
+        self.values[:30, 2] = np.nan
+        self.values[100:103, 2] = np.nan
+        indices = lttb(self.values, 60)
+        picked = self.values[indices[:, 2], 2]
+        self.assertFalse(np.isnan(picked[indices[:, 2] >= 30]).any())
+
+class TestSeriesPlotter(unittest.TestCase):
+    def test_downsample_is_cached_per_width(self):
+        months = [month_label(month_ordinal("2000M01") + i) for i in range(240)]
+        matrix = IndexMatrix(months, ["A", "B"], np.arange(480, dtype=float).reshape(240, 2))
+        plotter = SeriesPlotter(matrix)
+        reduced = plotter.downsample(40, start="2010M01")
+        self.assertIs(plotter.downsample(40, start="2010M01"), reduced)
+        self.assertEqual(reduced["values"].shape, (40, 2))
+        self.assertEqual(reduced["x"][0, 0], 2010.0)
+        self.assertEqual(reduced["values"][-1, 1], 479.0)
+
+if __name__ == '__main__':
+    unittest.main()
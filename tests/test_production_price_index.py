@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.base_data_source import FrozenDict
+from Hagstofan.economy.production_price_index import ProductionPriceIndex
+
+class FakeClient:
+    base_url = "fake"
+    # Added to every number, so a reload can publish revised values
+    revision = 0
+
+    def get_config(self):
+        return {"maxValues": 10 ** 6}
+
+    def get(self, path):
+        return {"variables": []}
+
+    def post(self, endpoint, body):
+        values = {"2024M01": "100", "2024M02": "101", "2024M03": "..", "2024M05": "104", "2024M06": "105"}
+        values = {month: str(float(value) + self.revision) if value != ".." else value for month, value in values.items()}
+        return {"data": [{"key": [month, "index", "Food"], "values": [value]} for month, value in values.items()]}
+
+class TestProductionPriceIndex(unittest.TestCase):
+    def setUp(self):
+        self.ppi = ProductionPriceIndex(FakeClient())
+
+    def test_historical_values_use_calendar_months(self):
+        self.assertEqual(self.ppi.get_historical_values("Food", months=3), [("2024M05", 104.0), ("2024M06", 105.0)])
+        self.assertEqual(len(self.ppi.get_historical_values("Food", months=6)), 4)
+
+    def test_reload_during_a_read(self):
+        ppi = self.ppi
+
+        class ReloadingIndex(FrozenDict):
+            # Publishes a revised snapshot the moment a reader starts iterating
+            def __iter__(self):
+                if ppi.snapshot().index is self:
+                    ppi.client.revision = 10
+                    ppi.load()
+                return super().__iter__()
+
+        snapshot = ppi.snapshot()
+        object.__setattr__(snapshot, "index", ReloadingIndex(snapshot.index))
+        self.assertEqual(ppi.get_historical_values("Food", months=3), [("2024M05", 104.0), ("2024M06", 105.0)])
+        self.assertEqual(ppi.index[("2024M06", "Food")], 115.0)
+
+    def test_placeholders_are_recorded(self):
+        self.assertEqual(self.ppi.missing, {("2024M03", "Food"): ".."})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.quality import QualityReport
+
+class TestQualityReport(unittest.TestCase):
+    def setUp(self):
+        index = {("2024M01", "IS00"): 100.0, ("2024M02", "IS00"): 101.0, ("2024M04", "IS00"): 103.0,
+                 ("2024M03", "IS01"): 50.0, ("2024M02", "IS01"): 49.0}
+        missing = {("2024M05", "IS00"): ".."}
+        self.report = QualityReport(index, missing, duplicates=[("2024M02", "IS00")])
+
+    def test_bitmaps(self):
+        self.assertEqual(self.report.months, ["2024M01", "2024M02", "2024M03", "2024M04", "2024M05"])
+        self.assertEqual(self.report.observed[:, 0].tolist(), [True, True, False, True, False])
+        self.assertEqual(self.report.gap[:, 0].tolist(), [False, False, True, False, False])
+        self.assertEqual(self.report.placeholder[:, 0].tolist(), [False, False, False, False, True])
+
+    def test_summary(self):
+        summary = self.report.summary()
+        self.assertEqual(summary["placeholders"], 1)
+        self.assertEqual(summary["gaps"], 1)
+        self.assertEqual(summary["duplicates"], 1)
+        self.assertEqual(summary["non_monotonic"], ["IS01"])
+        self.assertFalse(self.report.is_clean)
+
+    def test_missing_weights(self):
+        report = QualityReport({("2024M01", "IS00"): 100.0}, missing_weights={("2024M03", "IS01"): "."})
+        self.assertEqual(report.missing_weights, [("2024M03", "IS01")])
+        self.assertEqual(report.summary()["missing_weights"], 1)
+        self.assertFalse(report.is_clean)
+        self.assertTrue(QualityReport({("2024M01", "IS00"): 100.0}).is_clean)
+
+    def test_invalid_month_labels(self):
+        report = QualityReport({("2024", "IS00"): 1.0, ("2024M01", "IS00"): 1.0})
+        self.assertEqual(report.invalid_months, ["2024"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan import registry
+from Hagstofan.base_data_source import BaseDataSource
+
+class FakeClient:
+    base_url = "fake"
+
+class SlowSource(BaseDataSource):
+    loads = 0
+    fail_next = False
+    _lock = threading.Lock()
+
+    def __init__(self, client):
+        super().__init__(client, "fake/table.px")
+        self.load()
+
+    def load(self):
+        with SlowSource._lock:
+            SlowSource.loads += 1
+            fail, SlowSource.fail_next = SlowSource.fail_next, False
+        time.sleep(0.05)
+        if fail:
+            raise ConnectionError("server unavailable")
+        snapshot = self._new_snapshot()
+        snapshot.index = {("2024M01", "A"): float(SlowSource.loads)}
+        snapshot.missing = {}
+        snapshot.duplicates = []
+        self._publish(snapshot)
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        registry.clear()
+        SlowSource.loads = 0
+        SlowSource.fail_next = False
+
+    def tearDown(self):
+        registry.clear()
+
+    def test_concurrent_callers_share_one_load(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.shared(SlowSource, FakeClient())))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(SlowSource.loads, 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_failed_load_is_not_cached(self):
+        SlowSource.fail_next = True
+        with self.assertRaises(ConnectionError):
+            registry.shared(SlowSource, FakeClient())
+        source = registry.shared(SlowSource, FakeClient())
+        self.assertEqual(SlowSource.loads, 2)
+        self.assertIs(registry.shared(SlowSource, FakeClient()), source)
+
+    def test_shared_source_can_reload(self):
+        source = registry.shared(SlowSource, FakeClient())
+        with self.assertRaises(AttributeError):
+            source.index = {}
+        source.load()
+        self.assertEqual(source.index[("2024M01", "A")], 2.0)
+        self.assertIs(registry.refresh(SlowSource, FakeClient()), source)
+        self.assertEqual(source.version, 3)
+
+if __name__ == '__main__':
+    unittest.main()
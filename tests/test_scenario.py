@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.economy.scenario import ScenarioModel
+from Hagstofan.matrix import IndexMatrix
+
+class FakeCPI:
+    """
+    A loaded CPI stand-in: fixed levels and one set of weights for every month.
+    """
+
+    def __init__(self, levels, weights):
+        self.codes = list(levels)
+        self.matrix = IndexMatrix(["2024M01", "2024M02"], self.codes,
+                                  np.array([[levels[c] * 0.99 for c in self.codes], [levels[c] for c in self.codes]]))
+        self.weights = weights
+
+    def snapshot(self):
+        return self
+
+    def to_matrix(self):
+        return self.matrix
+
+    def weights_asof(self, months):
+        row = [self.weights.get(c, np.nan) for c in self.codes]
+        return IndexMatrix(months, self.codes, np.array([row] * len(months)))
+
+class TestScenarioModel(unittest.TestCase):
+    def setUp(self):
+        levels = {"IS00": 600.0, "IS01": 500.0, "IS011": 400.0, "IS012": 300.0, "IS02": 200.0, "IS09": 100.0}
+        weights = {"IS00": 1000.0, "IS01": 200.0, "IS011": 150.0, "IS012": 50.0, "IS02": 300.0, "IS09": 0.0}
+        self.model = ScenarioModel(FakeCPI(levels, weights))
+
+    def test_path_shares_are_weight_ratios(self):
+        nodes, shares = self.model.path("IS011")
+        self.assertEqual(nodes, ["IS011", "IS01", "IS00"])
+        np.testing.assert_allclose(shares, [1.0, 150 / 200, 150 / 1000])
+        self.assertEqual(self.model.path("IS02")[0], ["IS02", "IS00"])
+
+    def test_apply_moves_headline_by_weight_share(self):
+        result = self.model.apply({"IS011": 10}, horizon=3)
+        self.assertEqual(result["months"], ["2024M03", "2024M04", "2024M05"])
+        self.assertAlmostEqual(result["headline"][0], 600 * (1 + 0.15 * 10 / 100))
+        self.assertAlmostEqual(result["headline"][2], result["headline"][0])
+        self.assertAlmostEqual(result["index"][0, self.model.codes.index("IS012")], 300.0)
+
+    def test_apply_many_matches_apply(self):
+        scenarios = [{"IS011": 10}, {"IS02": [1, 2, 3], "IS012": -5}, {}]
+        batch = self.model.apply_many(scenarios, horizon=4, nodes=["IS00", "IS01"])
+        columns = [self.model.codes.index("IS00"), self.model.codes.index("IS01")]
+        for s, shocks in enumerate(scenarios):
+            single = self.model.apply(shocks, horizon=4)
+            np.testing.assert_allclose(batch["index"][s], single["index"][:, columns])
+
+    def test_unweighted_code(self):
+        self.assertNotIn("IS09", self.model.codes)
+        with self.assertRaises(KeyError):
+            self.model.apply({"IS09": 5})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import sys
+import os
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.matrix import IndexMatrix
+from Hagstofan.seasonal import SeasonalAdjuster
+
+class TestSeasonalAdjuster(unittest.TestCase):
+    def setUp(self):
+        t = np.arange(120)
+        season = 1 + 0.05 * np.sin(2 * np.pi * t / 12)
+        self.values = np.column_stack([100 * 1.003 ** t * season, 100 * 1.002 ** t])
+        self.months = [f"{2000 + i // 12}M{i % 12 + 1:02d}" for i in range(120)]
+
+    def test_removes_seasonality(self):
+        adjuster = SeasonalAdjuster(IndexMatrix(self.months, ["IS03", "IS00"], self.values))
+        raw = np.std(np.diff(np.log(self.values[:, 0])))
+        adjusted = np.std(np.diff(np.log(adjuster.adjusted().column("IS03"))))
+        self.assertLess(adjusted, raw / 10)
+        np.testing.assert_allclose(adjuster.factors[:, 1], 1.0, atol=1e-9)
+
+    def test_incremental_append_matches_full_fit(self):
+        full = SeasonalAdjuster(IndexMatrix(self.months, ["IS03", "IS00"], self.values))
+        incremental = SeasonalAdjuster(IndexMatrix(self.months[:100], ["IS03", "IS00"], self.values[:100]))
+        for i in range(100, 120):
+            row = incremental.append(self.months[i], self.values[i])
+            np.testing.assert_allclose(row, incremental.adjusted().values[i])
+        np.testing.assert_allclose(incremental.factors, full.factors)
+        np.testing.assert_allclose(incremental.adjusted().values, full.adjusted().values)
+
+    def test_short_history(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            adjuster = SeasonalAdjuster(IndexMatrix(self.months[:5], ["IS03", "IS00"], self.values[:5]))
+            np.testing.assert_array_equal(adjuster.factors, 1.0)
+            np.testing.assert_allclose(adjuster.append(self.months[5], self.values[5]), self.values[5])
+        self.assertEqual(len(adjuster.matrix), 6)
+        with self.assertRaises(ValueError):
+            adjuster.append(self.months[7], self.values[7])
+
+if __name__ == '__main__':
+    unittest.main()
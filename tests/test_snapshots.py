@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.base_data_source import BaseDataSource
+
+class FakeClient:
+    base_url = "fake"
+
+    def __init__(self):
+        self.loads = 0
+
+    def get_config(self):
+        return {"maxValues": 10 ** 9}
+
+    def get(self, path):
+        # Metadata without variables: queries are sent as they are
+        return {"title": "Fake"}
+
+    def post(self, endpoint, body):
+        self.loads += 1
+        return {"data": [{"key": [f"2024M{m:02d}", "A"], "values": [str(self.loads * 100 + m)]} for m in range(1, 7)]}
+
+class CountingSource(BaseDataSource):
+    def __init__(self, client):
+        super().__init__(client, "fake/table.px")
+        self.load()
+
+    def load(self):
+        raw_data = self.get_data({"query": [], "response": {"format": "json"}})
+        snapshot = self._new_snapshot()
+        snapshot.index = {tuple(e["key"]): float(e["values"][0]) for e in raw_data["data"]}
+        snapshot.missing = {}
+        snapshot.duplicates = []
+        self._publish(snapshot)
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.source = CountingSource(FakeClient())
+
+    def test_snapshot_is_read_only(self):
+        self.assertIsInstance(self.source.index, dict)
+        with self.assertRaises(TypeError):
+            self.source.index[("2024M07", "A")] = 1.0
+
+    def test_pinned_snapshot_survives_reload(self):
+        pinned = self.source.snapshot()
+        self.source.load()
+        self.assertEqual(pinned.version, 1)
+        self.assertEqual(self.source.version, 2)
+        self.assertEqual(pinned.to_matrix().values[0, 0], 101.0)
+        self.assertEqual(self.source.to_matrix().values[0, 0], 201.0)
+
+    def test_frozen_source_can_reload(self):
+        self.source.freeze()
+        self.source.load()
+        self.assertEqual(self.source.index[("2024M01", "A")], 201.0)
+
+    def test_readers_see_consistent_snapshots(self):
+        inconsistent = []
+
+        def read():
+            for _ in range(500):
+                snapshot = self.source.snapshot()
+                loads = {int(v) // 100 for v in snapshot.index.values()}
+                if loads != {int(snapshot.to_matrix().values[0, 0]) // 100}:
+                    inconsistent.append(loads)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for _ in range(20):
+            self.source.load()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(inconsistent, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Hagstofan.sqlite_store import SQLiteStore
+
+class FakeSource:
+    endpoint = "fake/table.px"
+    version = 1
+
+    def __init__(self, index, weights=None):
+        self.index = index
+        self.weights = weights or {}
+
+    def get_label(self, code):
+        return f"Label {code}"
+
+class TestSQLiteStore(unittest.TestCase):
+    def setUp(self):
+        self.store = SQLiteStore(":memory:")
+        self.index = {("2024M01", "IS00"): 100.0, ("2024M02", "IS00"): 101.0,
+                      ("2024M03", "IS01"): 50.0, ("2024M01", "IS01"): 49.0}
+        self.source = FakeSource(self.index, weights={("2024", "IS01"): 12.5})
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_upsert_writes_only_changes(self):
+        self.assertEqual(self.store.save("cpi", self.source), 5)
+        self.assertEqual(self.store.save("cpi", self.source), 0)
+        refreshed = dict(self.index)
+        refreshed[("2024M02", "IS00")] = 101.5
+        refreshed[("2024M04", "IS00")] = 102.0
+        self.assertEqual(self.store.save("cpi", FakeSource(refreshed)), 2)
+
+    def test_save_from_another_thread(self):
+        results = []
+        worker = threading.Thread(target=lambda: results.append(self.store.save("cpi", self.source)))
+        worker.start()
+        worker.join()
+        self.assertEqual(results, [5])
+        self.assertEqual(self.store.matrix("cpi").codes, ["IS00", "IS01"])
+
+    def test_query_returns_arrays(self):
+        self.store.save("cpi", self.source)
+        result = self.store.query("SELECT period, value FROM observations WHERE source = ? AND series = ? "
+                                  "ORDER BY period", ("cpi", "IS00"))
+        self.assertEqual(result["period"].tolist(), ["2024M01", "2024M02"])
+        self.assertEqual(result["value"].dtype, np.float64)
+        weights = self.store.query("SELECT value FROM observations WHERE source = 'cpi_weights'")
+        self.assertEqual(weights["value"].tolist(), [12.5])
+
+    def test_matrix_round_trip(self):
+        self.store.save("cpi", self.source)
+        matrix = self.store.matrix("cpi")
+        self.assertEqual(matrix.months, ["2024M01", "2024M02", "2024M03"])
+        self.assertEqual(matrix.codes, ["IS00", "IS01"])
+        self.assertEqual(matrix.column("IS01").tolist()[0], 49.0)
+        self.assertTrue(np.isnan(matrix.column("IS00")[2]))
+        subset = self.store.matrix("cpi", codes=["IS01"], start="2024M02")
+        self.assertEqual(subset.months, ["2024M03"])
+        self.assertEqual(self.store.labels("cpi")["IS01"], "Label IS01")
+
+if __name__ == '__main__':
+    unittest.main()